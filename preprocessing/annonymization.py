@@ -7,11 +7,15 @@ common_phrases = [
     "Liebe Kolleginnen und Kollegen",
     # Add more phrases as needed
 ]
-# Compile regex patterns for emails and phone numbers
-email_pattern = re.compile(r"\b[\w.-]+?@[\w.-]+\.\w+?\b")
+# Compile regex patterns for emails and phone numbers. Unicode classes are kept on purpose, so names with umlauts
+# are matched as a whole and NBSP counts as whitespace in phone numbers.
+email_pattern = re.compile(r"\b[\w.-]+?@[\w.-]+\.[^\W\d_]{2,}\b")
 phone_pattern = re.compile(r"\b(?:\+?\d{1,3}[-.\s]?|\(\d{1,4}\)\s?)?\d{1,4}[-.\s]?\d{1,4}[-.\s]?\d{1,9}\b")
 
 regex_substitutions = [
     ("EMAIL_PATTERN", email_pattern),
     ("PHONE_PATTERN", phone_pattern),
 ]
+
+# Single alternation of all patterns, so the text is scanned only once. The matched group name is the pattern name.
+combined_pattern = re.compile("|".join(f"(?P<{name}>{pattern.pattern})" for name, pattern in regex_substitutions))
@@ -2,6 +2,8 @@ import os
 import random
 import string
 import zipfile
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
 
 
 def generate_random_string(length):
@@ -49,7 +51,89 @@ def generate_random_phone():
     return f"+49 {random.randint(1000, 9999)} {random.randint(100000, 999999)}"
 
 
-def create_simulated_zip_files(base_zip_dir, month, num_zip_files=3, documents_per_zip=10, pages_per_document=5):
+def _build_zip(zip_num, base_zip_dir, documents_per_zip, pages_per_document, compresslevel):
+    """Create a single simulated ZIP file. Runs in a worker process."""
+    # Forked workers inherit the parent's random state, reseed so every ZIP gets different data
+    random.seed()
+
+    zip_name = f"sample_data_{zip_num}.zip"
+    zip_path = os.path.join(base_zip_dir, zip_name)
+
+    # Defaults to the fastest DEFLATE level, the generated archives are throwaway test data
+    with zipfile.ZipFile(zip_path, "w", zipfile.ZIP_DEFLATED, compresslevel=compresslevel) as zipf:
+        for doc_num in range(1, documents_per_zip + 1):
+            BatchID = f"Batch_{zip_num:03d}"
+            DocumentID = f"Doc_{doc_num:05d}"
+
+            # Create directory structure inside ZIP
+            dir_path = f"{BatchID}/{DocumentID}/"
+
+            # Generate base filename
+            base_filename = generate_random_string(7)  # e.g., 'ABCDEFG'
+
+            # Generate random personal data
+            name = generate_random_name()
+            email = generate_random_email(name)
+            date = generate_random_date()
+            phone = generate_random_phone()
+
+            # Include common phrases
+            common_phrase_intro = random.choice(
+                [
+                    "Sehr geehrte Damen und Herren",
+                    "Liebe Kolleginnen und Kollegen",
+                    "Guten Tag",
+                ]
+            )
+            common_phrase_outro = random.choice(
+                [
+                    "Mit freundlichen Grüßen",
+                    "Beste Grüße",
+                    "Hochachtungsvoll",
+                ]
+            )
+
+            # Create text file content with personal data and common phrases
+            ocr_text = f"""{common_phrase_intro},
+
+Mein Name ist {name} und ich wohne in Berlin. Sie können mich unter {email} oder {phone} erreichen.
+Heute ist der {date}.
+
+{common_phrase_outro},
+{name}
+"""
+
+            index_content = (
+                "zipname",
+                "filename",
+                "{Batch ID}",
+                BatchID,
+                "{Document ID}",
+                DocumentID,
+                "docType",
+                "bill",
+                "{pageCount}",
+                str(pages_per_document),
+                "",
+            )
+            index_content_str = ",".join(['"' + i + '"' for i in index_content])
+
+            # Define file paths within the ZIP
+            ocr_file_path = os.path.join(dir_path, f"{base_filename}.txt")
+            index_file_path = os.path.join(dir_path, f"{base_filename}_index.txt")
+
+            # Write OCR text file
+            zipf.writestr(ocr_file_path, ocr_text)
+
+            # Write index file uncompressed, DEFLATE costs more than it saves on a few hundred bytes
+            zipf.writestr(index_file_path, index_content_str, compress_type=zipfile.ZIP_STORED)
+
+    print(f"Created simulated ZIP file: {zip_path}")
+
+
+def create_simulated_zip_files(
+    base_zip_dir, month, num_zip_files=3, documents_per_zip=10, pages_per_document=5, compresslevel=1
+):
     """
     Create simulated ZIP files with the specified structure and dummy data.
 
@@ -59,82 +143,23 @@ def create_simulated_zip_files(base_zip_dir, month, num_zip_files=3, documents_p
     - num_zip_files (int): Number of ZIP files to create.
     - documents_per_zip (int): Number of documents per ZIP file.
     - pages_per_document (int): Number of pages per document.
+    - compresslevel (int): DEFLATE level of the OCR text entries, 1 (fastest) to 9 (smallest).
     """
     os.makedirs(base_zip_dir, exist_ok=True)
 
-    for zip_num in range(1, num_zip_files + 1):
-        zip_name = f"sample_data_{zip_num}.zip"
-        zip_path = os.path.join(base_zip_dir, zip_name)
-
-        with zipfile.ZipFile(zip_path, "w", zipfile.ZIP_DEFLATED) as zipf:
-            for doc_num in range(1, documents_per_zip + 1):
-                BatchID = f"Batch_{zip_num:03d}"
-                DocumentID = f"Doc_{doc_num:05d}"
-
-                # Create directory structure inside ZIP
-                dir_path = f"{BatchID}/{DocumentID}/"
-
-                # Generate base filename
-                base_filename = generate_random_string(7)  # e.g., 'ABCDEFG'
-
-                # Generate random personal data
-                name = generate_random_name()
-                email = generate_random_email(name)
-                date = generate_random_date()
-                phone = generate_random_phone()
-
-                # Include common phrases
-                common_phrase_intro = random.choice(
-                    [
-                        "Sehr geehrte Damen und Herren",
-                        "Liebe Kolleginnen und Kollegen",
-                        "Guten Tag",
-                    ]
-                )
-                common_phrase_outro = random.choice(
-                    [
-                        "Mit freundlichen Grüßen",
-                        "Beste Grüße",
-                        "Hochachtungsvoll",
-                    ]
-                )
-
-                # Create text file content with personal data and common phrases
-                ocr_text = f"""{common_phrase_intro},
-
-Mein Name ist {name} und ich wohne in Berlin. Sie können mich unter {email} oder {phone} erreichen.
-Heute ist der {date}.
-
-{common_phrase_outro},
-{name}
-"""
-
-                index_content = (
-                    "zipname",
-                    "filename",
-                    "{Batch ID}",
-                    BatchID,
-                    "{Document ID}",
-                    DocumentID,
-                    "docType",
-                    "bill",
-                    "{pageCount}",
-                    str(pages_per_document),
-                    "",
-                )
-                index_content_str = ",".join(['"' + i + '"' for i in index_content])
-
-                # Define file paths within the ZIP
-                ocr_file_path = os.path.join(dir_path, f"{base_filename}.txt")
-                index_file_path = os.path.join(dir_path, f"{base_filename}_index.txt")
-
-                # Write OCR text file
-                zipf.writestr(ocr_file_path, ocr_text)
-
-                # Write index file
-                zipf.writestr(index_file_path, index_content_str)
-
-        print(f"Created simulated ZIP file: {zip_path}")
+    # ZIP files are independent of each other, so they are built in parallel
+    zip_nums = range(1, num_zip_files + 1)
+    with ProcessPoolExecutor() as executor:
+        list(
+            executor.map(
+                _build_zip,
+                zip_nums,
+                repeat(base_zip_dir),
+                repeat(documents_per_zip),
+                repeat(pages_per_document),
+                repeat(compresslevel),
+            )
+        )
 
 
 def main():
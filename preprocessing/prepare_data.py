@@ -1,58 +1,105 @@
+import csv
+import hashlib
 import logging
 import os
 import re
 import time
 import zipfile
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
 from glob import glob
+from itertools import repeat
 from multiprocessing import Pool, cpu_count
-from typing import Dict, Generator, List, Set
+from typing import Any, Callable, Dict, Generator, List, Optional, Set, Tuple
 
 import pandas as pd
 import spacy
-from annonymization import common_phrases, regex_substitutions
-from spacy.matcher import Matcher
+from annonymization import combined_pattern, common_phrases
+from spacy.language import Language
+from spacy.tokens import Doc
 
 # Configure logging
 logging.basicConfig(level=logging.INFO, format="%(asctime)s:%(levelname)s:%(message)s")
 
-nlp = spacy.load("de_core_news_md")
-
-# Initialize the Matcher and EntityRuler
-matcher = Matcher(nlp.vocab)
-
-# Create patterns for the Matcher
-patterns = [[{"LOWER": token.lower_} for token in nlp(text)] for text in common_phrases]
-matcher.add("COMMON_PHRASES", patterns)
+# Key of the doc.spans group holding the matched common phrases
+COMMON_PHRASES_KEY = "common_phrases"
+# Pipeline components not needed for phrase matching and NER
+UNUSED_PIPES = ["tagger", "morphologizer", "parser", "lemmatizer", "attribute_ruler"]
+NLP_BATCH_SIZE = 64
+ANONYMIZED_ENTITY_TYPES = {"PER", "ORG", "LOC"}
+
+# LRU cache of anonymized texts, as near-identical letters repeat a lot. It is keyed on a digest of the
+# original text and bounded by the total length of the stored texts, so long documents don't pile up in memory.
+# Very short texts are not cached, as they are cheap to process anyway.
+ANONYMIZATION_CACHE_MAX_CHARS = 16_000_000
+MIN_CACHED_TEXT_LENGTH = 128
+anonymization_cache: "OrderedDict[bytes, str]" = OrderedDict()
+anonymization_cache_chars = 0
+
+
+@lru_cache(maxsize=1)
+def get_nlp() -> Language:
+    """Load the German spaCy model once per process, without the components not needed for NER.
+
+    Common phrases are matched case-insensitively by a span ruler inside the pipeline, so matching runs as part of
+    ``nlp.pipe`` and the matches end up in ``doc.spans[COMMON_PHRASES_KEY]``.
+    """
+    nlp = spacy.load("de_core_news_md", exclude=UNUSED_PIPES)
+    ruler = nlp.add_pipe("span_ruler", config={"spans_key": COMMON_PHRASES_KEY, "phrase_matcher_attr": "LOWER"})
+    ruler.add_patterns([{"label": "COMMON_PHRASES", "pattern": text} for text in common_phrases])
+    return nlp
+
+
+def _init_worker(blacklist_emails: Set[str]) -> None:
+    """Load the spaCy model and compile the blacklist once when a worker process starts."""
+    get_nlp()
+    set_blacklist(blacklist_emails)
+
+
+def _extract_one(zip_path: str, output_dir: str, month: str, force: bool = False) -> None:
+    """Unzip a single file into its own subfolder of the output directory."""
+    zip_name = os.path.basename(zip_path)
+    zip_name_no_ext = os.path.splitext(zip_name)[0]
+    extract_dir = os.path.join(output_dir, month, zip_name_no_ext)
+    if not force and os.path.exists(extract_dir):
+        logging.info(f"Skipping {zip_name} as it already exists in {extract_dir}")
+        return
+    os.makedirs(extract_dir, exist_ok=True)
+    logging.info(f"Extracting {zip_name} to {extract_dir}")
+    try:
+        with zipfile.ZipFile(zip_path, "r") as zip_ref:
+            zip_ref.extractall(extract_dir)
+    except zipfile.BadZipFile as e:
+        logging.error(f"Error extracting {zip_name}: {e}")
 
 
 def unzip_files(zip_dir: str, output_dir: str, month: str, force: bool = False) -> None:
-    """Unzip all files in the given directory."""
+    """Unzip all files in the given directory in parallel."""
     zip_files = glob(os.path.join(zip_dir, "*.zip"))
-    for zip_path in zip_files:
-        zip_name = os.path.basename(zip_path)
-        zip_name_no_ext = os.path.splitext(zip_name)[0]
-        extract_dir = os.path.join(output_dir, month, zip_name_no_ext)
-        if not force and os.path.exists(extract_dir):
-            logging.info(f"Skipping {zip_name} as it already exists in {extract_dir}")
-            continue
-        os.makedirs(extract_dir, exist_ok=True)
-        logging.info(f"Extracting {zip_name} to {extract_dir}")
-        try:
-            with zipfile.ZipFile(zip_path, "r") as zip_ref:
-                zip_ref.extractall(extract_dir)
-        except zipfile.BadZipFile as e:
-            logging.error(f"Error extracting {zip_name}: {e}")
+    if zip_files:
+        # zlib releases the GIL while inflating, so threads parallelize extraction without worker processes
+        with ThreadPoolExecutor(max_workers=min(len(zip_files), cpu_count())) as executor:
+            list(executor.map(_extract_one, zip_files, repeat(output_dir), repeat(month), repeat(force)))
     logging.info("All zip files processed.")
 
 
+def iter_index_files(root_dir: str) -> Generator[str, None, None]:
+    """Yield all index files in the directory tree."""
+    # scandir entries carry the file type from the directory listing, so no extra stat per entry is needed
+    with os.scandir(root_dir) as entries:
+        for entry in entries:
+            if entry.is_dir(follow_symlinks=False):
+                yield from iter_index_files(entry.path)
+            elif entry.name.endswith("_index.txt"):
+                yield entry.path
+
+
 def find_index_files(root_dir: str) -> List[str]:
     """Find all index files in the directory tree."""
-    index_files = []
-    for dirpath, _, filenames in os.walk(root_dir):
-        for filename in filenames:
-            if filename.endswith("_index.txt"):
-                index_files.append(os.path.join(dirpath, filename))
-    return index_files
+    if not os.path.isdir(root_dir):
+        return []
+    return list(iter_index_files(root_dir))
 
 
 def get_batch_id(index_file_path: str) -> str:
@@ -63,16 +110,85 @@ def get_doc_id(index_file_path: str) -> str:
     return index_file_path.replace("\n", "").split("\\")[-1].split(".")[0]
 
 
+def decode_text(raw: bytes) -> str:
+    """Decode UTF-8 file content with the universal newline handling of text mode."""
+    content = raw.decode("utf-8")
+    if "\r" in content:
+        content = content.replace("\r\n", "\n").replace("\r", "\n")
+    return content
+
+
+def read_raw_file(file_path: str) -> bytes:
+    """Read a whole file with a single unbuffered read."""
+    # Unbuffered reads size the buffer from fstat and pull the file in one syscall
+    with open(file_path, "rb", buffering=0) as f:
+        return f.read()
+
+
+def read_file(file_path: str) -> str:
+    """Read a whole UTF-8 file with a single unbuffered read."""
+    return decode_text(read_raw_file(file_path))
+
+
+def read_index_file(index_file_path: str) -> str:
+    """Read the content of the index file."""
+    try:
+        return read_file(index_file_path)
+    except Exception as e:
+        logging.error(f"Error reading index file {index_file_path}: {e}")
+        return ""
+
+
+def read_index_member(zipf: zipfile.ZipFile, index_member: str) -> str:
+    """Read the content of an index file inside a zip file."""
+    try:
+        return decode_text(zipf.read(index_member))
+    except Exception as e:
+        logging.error(f"Error reading index file {zipf.filename}:{index_member}: {e}")
+        return ""
+
+
 def parse_index_file(index_file_path: str) -> Dict[str, str]:
     """Parse the index file into a dictionary."""
+    return parse_index_content(read_index_file(index_file_path), index_file_path)
 
-    try:
-        with open(index_file_path, "r", encoding="utf-8") as f:
-            content = f.read().strip()
-        items = [item.strip().strip('"') for item in content.split(",")]
 
+def parse_index_files(index_file_paths: List[str]) -> List[Dict[str, str]]:
+    """Parse many index files into dictionaries."""
+    contents = [read_index_file(index_file_path) for index_file_path in index_file_paths]
+    return parse_index_contents(contents, index_file_paths)
+
+
+def parse_index_content(content: str, index_source: str) -> Dict[str, str]:
+    """Parse the content of an index file into a dictionary."""
+    return parse_index_contents([content], [index_source])[0]
+
+
+def parse_index_contents(contents: List[str], index_sources: List[str]) -> List[Dict[str, str]]:
+    """Parse the contents of many index files into dictionaries.
+
+    Index files are single CSV lines, so each one is split and unquoted by the csv reader in C
+    instead of splitting and stripping every item in Python. Every file gets its own reader, so an
+    unterminated quote in one file can not swallow the line of the next one and shift the results.
+    """
+    return [
+        parse_index_items(split_index_line(content), index_source)
+        for content, index_source in zip(contents, index_sources)
+    ]
+
+
+def split_index_line(content: str) -> List[str]:
+    """Split and unquote the single CSV line of an index file into its items."""
+    row = next(csv.reader([content.strip().replace("\n", " ")], skipinitialspace=True), [])
+    return [item.strip() for item in row]
+
+
+def parse_index_items(items: List[str], index_source: str) -> Dict[str, str]:
+    """Build the dictionary of an index file from its unquoted items."""
+
+    try:
         if len(items) % 2 == 0:
-            logging.warning(f"Even number ({len(items)}) of items in {index_file_path}. Expected odd number.")
+            logging.warning(f"Even number ({len(items)}) of items in {index_source}. Expected odd number.")
 
         if items[-1] == "":
             logging.debug(f"Classification index file. Dropping last item: {items[-1]}.")
@@ -96,7 +212,7 @@ def parse_index_file(index_file_path: str) -> Dict[str, str]:
 
         return data
     except Exception as e:
-        logging.error(f"Error parsing index file {index_file_path}: {e}")
+        logging.error(f"Error parsing index file {index_source}: {e}")
         return {}
 
 
@@ -125,100 +241,262 @@ def get_text_file_path(index_file_path: str) -> str:
     return os.path.join(base_dir, base_filename)
 
 
+def get_text_member_name(index_member_name: str) -> str:
+    """Get the corresponding text file name inside a zip file for the index file."""
+    return index_member_name[: -len("_index.txt")] + ".txt"
+
+
 def read_text_file(text_file_path: str) -> str:
     """Read the content of the text file."""
     try:
-        with open(text_file_path, "r", encoding="utf-8") as f:
-            return f.read()
+        return read_file(text_file_path)
     except Exception as e:
         logging.error(f"Error reading text file {text_file_path}: {e}")
         return ""
 
 
-def is_blacklisted(text: str, blacklist_emails: Set[str]) -> bool:
-    """Check if the text contains any blacklisted emails."""
-    text_lower = text.lower()
-    for email in blacklist_emails:
-        if email.lower() in text_lower:
-            return True
-    return False
+def read_raw_text(read: Callable[[str], bytes], text_source: str) -> bytes:
+    """Read the raw content of a text file, an unreadable file is logged and treated as empty."""
+    try:
+        return read(text_source)
+    except Exception as e:
+        logging.error(f"Error reading text file {text_source}: {e}")
+        return b""
+
+
+def decode_text_or_empty(raw: bytes, text_source: str) -> str:
+    """Decode the content of a text file, an undecodable file is logged and treated as empty."""
+    try:
+        return decode_text(raw)
+    except UnicodeDecodeError as e:
+        logging.error(f"Error reading text file {text_source}: {e}")
+        return ""
+
+
+def compile_blacklist(blacklist_emails: Set[str]) -> re.Pattern:
+    """Compile the blacklisted emails into a single case-insensitive pattern over raw UTF-8 bytes."""
+    if not blacklist_emails:
+        return re.compile(rb"(?!)")  # never matches
+    # Longest first, so an email is not shadowed by a shorter one it contains
+    emails = sorted(blacklist_emails, key=len, reverse=True)
+    return re.compile(b"|".join(re.escape(email.encode("utf-8")) for email in emails), re.IGNORECASE)
+
+
+# Compiled blacklist of the current process, set via set_blacklist
+blacklist_pattern = compile_blacklist(set())
+
+
+def set_blacklist(blacklist_emails: Set[str]) -> None:
+    """Compile the blacklisted emails once for this process."""
+    global blacklist_pattern
+    blacklist_pattern = compile_blacklist(blacklist_emails)
+
+
+def is_blacklisted(raw_text: bytes) -> bool:
+    """Check if the raw text contains any blacklisted emails set via set_blacklist.
+
+    The check runs on the undecoded file content, so blacklisted documents are skipped before decoding.
+    """
+    return blacklist_pattern.search(raw_text) is not None
 
 
 def remove_common_phrases(text: str) -> str:
     """Remove common phrases from the text."""
-    doc = nlp(text)
-    matches = matcher(doc)
-    spans = [doc[start:end] for _, start, end in matches]
-    spans = spacy.util.filter_spans(spans)
+    doc = get_nlp()(text)
+    spans = spacy.util.filter_spans(doc.spans[COMMON_PHRASES_KEY])
 
-    # Replace matched phrases with [REDACTED_PHRASE]
-    for span in spans:
-        # Use regex to ensure exact phrase replacement, considering word boundaries
-        pattern = re.compile(re.escape(span.text))
-        text = pattern.sub("[REDACTED_PHRASE]", text)
+    # Replace matched phrases with [REDACTED_PHRASE], rebuilding the text once from the span offsets
+    parts = []
+    last_end = 0
+    for span in sorted(spans, key=lambda span: span.start_char):
+        parts.append(text[last_end : span.start_char])  # noqa: E203
+        parts.append("[REDACTED_PHRASE]")
+        last_end = span.end_char
+    parts.append(text[last_end:])
+    return "".join(parts)
 
-    return text
+
+def substitute_patterns(text: str) -> str:
+    """Replace emails, phone numbers and other regex matches in the text."""
+    return combined_pattern.sub(lambda match: f"[REDACTED_{match.lastgroup}]", text)
 
 
 def anonymize_text(text: str) -> str:
     """Anonymize personal data in the text."""
-    for pattern_name, pattern in regex_substitutions:
-        text = pattern.sub(f"[REDACTED_{pattern_name}]", text)
+    text = substitute_patterns(text)
 
-    doc = nlp(text)
+    doc = get_nlp()(text)
     anonymized_tokens = []
     for token in doc:
-        if token.ent_type_ in ["PER", "ORG", "LOC"]:
+        if token.ent_type_ in ANONYMIZED_ENTITY_TYPES:
             anonymized_tokens.append("[REDACTED]")
         else:
             anonymized_tokens.append(token.text_with_ws)
     return "".join(anonymized_tokens)
 
 
-def process_index_files(
-    index_files_chunk: List[str], chunk_number: int, output_dir: str, blacklist_emails: Set[str]
-) -> None:
-    """Process a chunk of index files."""
+def redact_doc(doc: Doc) -> str:
+    """Redact common phrases and named entities of a processed document in a single pass over its tokens."""
+    spans = spacy.util.filter_spans(doc.spans[COMMON_PHRASES_KEY])
+    phrase_ends = {span.start: span.end for span in spans}
+
+    redacted_tokens = []
+    i = 0
+    while i < len(doc):
+        if i in phrase_ends:
+            end = phrase_ends[i]
+            redacted_tokens.append("[REDACTED_PHRASE]" + doc[end - 1].whitespace_)
+            i = end
+            continue
+        token = doc[i]
+        if token.ent_type_ in ANONYMIZED_ENTITY_TYPES:
+            redacted_tokens.append("[REDACTED]")
+        else:
+            redacted_tokens.append(token.text_with_ws)
+        i += 1
+    return "".join(redacted_tokens)
+
+
+def text_digest(text: str) -> bytes:
+    """Return a short digest of a text to use as anonymization cache key."""
+    return hashlib.blake2b(text.encode(), digest_size=16).digest()
+
+
+def cache_anonymized_text(key: bytes, anonymized_text: str) -> None:
+    """Store an anonymized text and evict the least recently used ones above the character budget."""
+    global anonymization_cache_chars
+    anonymization_cache[key] = anonymized_text
+    anonymization_cache_chars += len(anonymized_text)
+    while anonymization_cache_chars > ANONYMIZATION_CACHE_MAX_CHARS:
+        _, evicted = anonymization_cache.popitem(last=False)
+        anonymization_cache_chars -= len(evicted)
+
+
+def anonymize_texts(texts: List[str]) -> List[str]:
+    """Remove common phrases and anonymize personal data for a batch of texts.
+
+    All texts are run through spaCy once via ``nlp.pipe`` instead of calling ``nlp`` per text and step.
+    Texts seen before or repeated within the batch are only processed once.
+    """
+    results: List[Optional[str]] = [None] * len(texts)
+    missing: Dict[str, List[int]] = {}
+    for i, text in enumerate(texts):
+        key = text_digest(text) if len(text) >= MIN_CACHED_TEXT_LENGTH else None
+        cached = anonymization_cache.get(key) if key is not None else None
+        if cached is not None:
+            anonymization_cache.move_to_end(key)
+            results[i] = cached
+        else:
+            missing.setdefault(text, []).append(i)
+
+    missing_texts = list(missing)
+    docs = get_nlp().pipe((substitute_patterns(text) for text in missing_texts), batch_size=NLP_BATCH_SIZE)
+    for text, doc in zip(missing_texts, docs):
+        anonymized_text = redact_doc(doc)
+        for i in missing[text]:
+            results[i] = anonymized_text
+        if len(text) >= MIN_CACHED_TEXT_LENGTH:
+            cache_anonymized_text(text_digest(text), anonymized_text)
+    return results
+
+
+def process_index_files(index_files_chunk: List[str], chunk_number: int, output_dir: str) -> None:
+    """Process a chunk of extracted index files."""
     data_list = []
+    texts = []
     count_blacklist = 0
-    for index_file in index_files_chunk:
+    for index_file, data in zip(index_files_chunk, parse_index_files(index_files_chunk)):
         try:
-            data = parse_index_file(index_file)
             if not is_expected_format(data):  # log message in function
                 continue
 
             text_file = get_text_file_path(index_file)
             if os.path.exists(text_file):
-                text = read_text_file(text_file)
+                raw_text = read_raw_text(read_raw_file, text_file)
 
                 # Blacklist is a set of email addresses from employees who are not allowed to be mentioned in the text
-                is_blacklist = is_blacklisted(text, blacklist_emails)
+                is_blacklist = is_blacklisted(raw_text)
                 if is_blacklist:
                     logging.info(f"Blacklisted email found in {index_file}")
                     count_blacklist += 1
                     continue
-
-                text = remove_common_phrases(text)
-                anonymized_text = anonymize_text(text)
-                data["text"] = anonymized_text
+                text = decode_text_or_empty(raw_text, text_file)
             else:
-                data["text"] = ""
+                text = ""
             data_list.append(data)
+            texts.append(text)
         except Exception as e:
             logging.error(f"Error processing {index_file}: {e}")
 
+    save_chunk(data_list, texts, chunk_number, output_dir)
+    log_blacklist_count(count_blacklist, len(index_files_chunk))
+
+
+def process_zip_documents(zip_path: str, index_members_chunk: List[str], chunk_number: int, output_dir: str) -> None:
+    """Process a chunk of index files read directly from a zip file, without extracting it."""
+    data_list = []
+    texts = []
+    count_blacklist = 0
+    with zipfile.ZipFile(zip_path, "r") as zipf:
+        members = set(zipf.namelist())
+        index_sources = [f"{zip_path}:{index_member}" for index_member in index_members_chunk]
+        index_contents = [read_index_member(zipf, index_member) for index_member in index_members_chunk]
+        index_data = parse_index_contents(index_contents, index_sources)
+        for index_member, index_source, data in zip(index_members_chunk, index_sources, index_data):
+            try:
+                if not is_expected_format(data):  # log message in function
+                    continue
+
+                text_member = get_text_member_name(index_member)
+                if text_member in members:
+                    raw_text = read_raw_text(zipf.read, text_member)
+
+                    # Blacklist is a set of email addresses from employees who are not allowed to be mentioned
+                    if is_blacklisted(raw_text):
+                        logging.info(f"Blacklisted email found in {index_source}")
+                        count_blacklist += 1
+                        continue
+                    text = decode_text_or_empty(raw_text, f"{zip_path}:{text_member}")
+                else:
+                    text = ""
+                data_list.append(data)
+                texts.append(text)
+            except Exception as e:
+                logging.error(f"Error processing {index_source}: {e}")
+
+    save_chunk(data_list, texts, chunk_number, output_dir)
+    log_blacklist_count(count_blacklist, len(index_members_chunk))
+
+
+def save_chunk(data_list: List[Dict[str, str]], texts: List[str], chunk_number: int, output_dir: str) -> None:
+    """Anonymize the texts of a chunk and save the chunk as a dataframe."""
+    # Run all texts of the chunk through spaCy in one batch
+    for data, anonymized_text in zip(data_list, anonymize_texts(texts)):
+        data["text"] = anonymized_text
+
     df = pd.DataFrame(data_list)
-    # Save dataframe to pickle in new subfolder
+    # Save dataframe to parquet in new subfolder
     final_output_dir = os.path.join(output_dir, "final_dataframes")
     os.makedirs(final_output_dir, exist_ok=True)
-    pickle_file = os.path.join(final_output_dir, f"dataframe_chunk_{chunk_number}.pkl")
-    df.to_pickle(pickle_file)
-    logging.info(f"Chunk {chunk_number} processed and saved to {pickle_file}")
+    parquet_file = os.path.join(final_output_dir, f"dataframe_chunk_{chunk_number}.parquet")
+    df.to_parquet(parquet_file, engine="pyarrow", compression="zstd")
+    logging.info(f"Chunk {chunk_number} processed and saved to {parquet_file}")
+
 
+def log_blacklist_count(count_blacklist: int, chunk_size: int) -> None:
+    """Log how many documents of a chunk were skipped because of blacklisted emails."""
     if count_blacklist > 0:
-        logging.info(
-            f"Found {count_blacklist} blacklisted emails ({count_blacklist/len(index_files_chunk)}%) in this chunk."
-        )
+        logging.info(f"Found {count_blacklist} blacklisted emails ({count_blacklist/chunk_size}%) in this chunk.")
+
+
+def find_zip_index_files(zip_path: str) -> List[str]:
+    """Find all index files inside a zip file."""
+    try:
+        with zipfile.ZipFile(zip_path, "r") as zipf:
+            return [name for name in zipf.namelist() if name.endswith("_index.txt")]
+    except zipfile.BadZipFile as e:
+        logging.error(f"Error reading {os.path.basename(zip_path)}: {e}")
+        return []
 
 
 def chunks(lst: List[str], n: int) -> Generator[List[str], None, None]:
@@ -227,38 +505,45 @@ def chunks(lst: List[str], n: int) -> Generator[List[str], None, None]:
         yield lst[i : i + n]  # noqa: E203
 
 
+def iter_zip_chunks(zip_dir: str, chunk_size: int) -> Generator[Tuple[str, List[str]], None, None]:
+    """Yield chunks of index files per zip file in the given directory."""
+    for zip_path in glob(os.path.join(zip_dir, "*.zip")):
+        index_members = find_zip_index_files(zip_path)
+        logging.info(f"Found {len(index_members)} index files in {zip_path}.")
+        for chunk in chunks(index_members, chunk_size):
+            yield zip_path, chunk
+
+
+def _process_zip_documents_star(args: Tuple[Any, ...]) -> None:
+    """Unpack the arguments for process_zip_documents, as imap_unordered passes a single argument."""
+    process_zip_documents(*args)
+
+
 def main(multiprocessing=True) -> None:
     zip_dir = "simulated_zip_files"  # Directory where zip files are stored
     output_dir = "processed_data"  # Output directory
-    month = "2023-10"
-    unzip_dir = os.path.join(output_dir, "unzipped_files")
-    os.makedirs(unzip_dir, exist_ok=True)
 
     # Define blacklist emails
     blacklist_emails = {"blacklisted@example.com", "spamuser@example.org", "max.mustermann@example.com,"}
 
-    # Step 1: Unzip files
-    unzip_files(zip_dir, unzip_dir, month)
-
-    # Step 2: Find index files
-    root_dir = os.path.join(unzip_dir, month)
-    index_files = find_index_files(root_dir)
-    logging.info(f"Found {len(index_files)} index files.")
-
-    # Step 3: Process index files in chunks using multiprocessing
+    # Find index files inside the zip files and process them in chunks. The documents are read straight from
+    # the archives, so nothing is extracted to disk. Chunks are generated lazily, so processing starts right away.
     chunk_size = 100  # Adjust based on available memory
-    chunks_list = list(chunks(index_files, chunk_size))
+    args_iter = (
+        (zip_path, chunk, i, output_dir) for i, (zip_path, chunk) in enumerate(iter_zip_chunks(zip_dir, chunk_size))
+    )
 
     if not multiprocessing:
         logging.info("Processing index files sequentially.")
-        for i, chunk in enumerate(chunks_list):
-            process_index_files(chunk, i, output_dir, blacklist_emails)
+        set_blacklist(blacklist_emails)
+        for args in args_iter:
+            process_zip_documents(*args)
     else:
         logging.info(f"Processing index files in parallel using {cpu_count()} cores")
-        with Pool(cpu_count()) as pool:
-            pool.starmap(
-                process_index_files, [(chunk, i, output_dir, blacklist_emails) for i, chunk in enumerate(chunks_list)]
-            )
+        # The blacklist is compiled once per worker instead of being shipped with every chunk
+        with Pool(cpu_count(), initializer=_init_worker, initargs=(blacklist_emails,)) as pool:
+            for _ in pool.imap_unordered(_process_zip_documents_star, args_iter):
+                pass
 
 
 if __name__ == "__main__":
@@ -1,3 +1,5 @@
+from typing import List
+
 import pandas as pd
 import streamlit as st
 
@@ -5,6 +7,7 @@ from st_data_analysis.data_analysis import (
     compute_presence_in_text,
     document_explorer,
     draw_sidebar,
+    melt_presence,
     plot_attribute_presence,
     plot_autoclass_influence,
     plot_doc_attr_counts,
@@ -15,27 +18,36 @@ from st_data_analysis.data_analysis import (
 
 
 @st.cache_data
-def load_data(pickle_filename: str) -> pd.DataFrame:
-    return pd.read_pickle(pickle_filename)
+def load_data(parquet_filename: str, columns: List[str]) -> pd.DataFrame:
+    # Only the columns used by the dashboard are read from the columnar file
+    df = pd.read_parquet(parquet_filename, columns=columns)
+    # Filter columns have few distinct values, as categories unique and isin work on the integer codes
+    for col in ("DocumentType", "InputChannel", "Autoclass"):
+        df[col] = df[col].astype("category")
+    return df
 
 
 def run_dashboard():
     st.title("Document Analysis Dashboard")
-    df = load_data("dummy_dataframe.pkl")
     numeric_cols = ["Number1", "Number2", "Number3"]
+    columns = ["Document_ID", "DocumentType", "InputChannel", "Autoclass", "clean_text", *numeric_cols]
+    parquet_filename = "dummy_dataframe.parquet"
+    df = load_data(parquet_filename, columns)
 
     # Sidebar filters
-    filtered_df = draw_sidebar(df)
+    filtered_df, selection = draw_sidebar(df)
 
-    # Compute presence columns
-    filtered_df = compute_presence_in_text(filtered_df, numeric_cols)
+    # Compute presence columns, cached per data file and filter selection so widget interactions do not rescan
+    # the texts and the filtered frame is never hashed
+    filtered_df = compute_presence_in_text(filtered_df, numeric_cols, (parquet_filename, selection))
+    presence_df = melt_presence(filtered_df, numeric_cols)
 
     # Plots
     plot_doc_attr_counts(filtered_df, numeric_cols)
     plot_non_nan_ratio(filtered_df, numeric_cols)
     plot_non_nan_ratio_by_doc_type(filtered_df, numeric_cols)
     plot_input_channel_influence(filtered_df, numeric_cols)
-    plot_attribute_presence(filtered_df, numeric_cols)
+    plot_attribute_presence(presence_df)
     plot_autoclass_influence(filtered_df, numeric_cols)
 
     # Document Explorer
@@ -1,8 +1,7 @@
 import enum
-import pickle
-import random
 import string
 
+import numpy as np
 import pandas as pd
 
 
@@ -36,35 +35,36 @@ if __name__ == "__main__":
     # Number of sample rows
     num_rows = 1000
 
-    # Function to generate random numbers of a specific length
-    def generate_number(length):
-        return "".join(random.choices(string.digits, k=length))
+    rng = np.random.default_rng()
+
+    # Function to generate random numbers of a specific length, drawn for all rows at once
+    def generate_numbers(length):
+        digits = rng.integers(0, 10, size=(num_rows, length))
+        # Join the single digit characters of each row into one string of the given length
+        return np.array(list(string.digits))[digits].view(f"U{length}").ravel()
 
     # Generate identifiers
     batch_ids = [f"BATCH_{i:04d}" for i in range(1, num_rows + 1)]
     document_ids = [f"DOC_{i:06d}" for i in range(1, num_rows + 1)]
 
     # Generate categorical data
-    document_types = [random.choice(list(DocumentType)).value for _ in range(num_rows)]
-    input_channels = [random.choice(list(InputChannel)).value for _ in range(num_rows)]
-    autoclasses = [random.choice(list(AutoUpload)).value for _ in range(num_rows)]
+    document_types = rng.choice([e.value for e in DocumentType], size=num_rows)
+    input_channels = rng.choice([e.value for e in InputChannel], size=num_rows)
+    autoclasses = rng.choice([e.value for e in AutoUpload], size=num_rows)
 
     # Generate extraction numbers with a 70% chance of having a number, else None
-    number1 = [generate_number(5) if random.random() > 0.3 else None for _ in range(num_rows)]
-    number2 = [generate_number(7) if random.random() > 0.3 else None for _ in range(num_rows)]
-    number3 = [generate_number(10) if random.random() > 0.3 else None for _ in range(num_rows)]
-
-    # Generate clean_text, including numbers with a 50% chance if they exist
-    clean_text = []
-    for i in range(num_rows):
-        text = "This is a sample document."
-        if number1[i] and random.random() > 0.5:
-            text += f" Number1: {number1[i]}."
-        if number2[i] and random.random() > 0.5:
-            text += f" Number2: {number2[i]}."
-        if number3[i] and random.random() > 0.5:
-            text += f" Number3: {number3[i]}."
-        clean_text.append(text)
+    clean_text = np.full(num_rows, "This is a sample document.")
+    numbers = {}
+    for col, length in zip(extraction_columns, (5, 7, 10)):
+        values = generate_numbers(length)
+        has_number = rng.random(num_rows) > 0.3
+        numbers[col] = np.where(has_number, values.astype(object), None)
+
+        # Generate clean_text, including numbers with a 50% chance if they exist
+        in_text = has_number & (rng.random(num_rows) > 0.5)
+        clean_text = np.where(
+            in_text, np.char.add(np.char.add(clean_text, f" {col}: "), np.char.add(values, ".")), clean_text
+        )
 
     # Create the DataFrame
     data = {
@@ -72,9 +72,7 @@ if __name__ == "__main__":
         "Document_ID": document_ids,
         "DocumentType": document_types,
         "clean_text": clean_text,
-        "Number1": number1,
-        "Number2": number2,
-        "Number3": number3,
+        **numbers,
         "InputChannel": input_channels,
         "Autoclass": autoclasses,
     }
@@ -84,9 +82,8 @@ if __name__ == "__main__":
     # Display the first few rows of the DataFrame
     print(df.head())
 
-    # Store the DataFrame in a pickle file
-    pickle_filename = "dummy_dataframe.pkl"
-    with open(pickle_filename, "wb") as f:
-        pickle.dump(df, f)
+    # Store the DataFrame in a parquet file
+    parquet_filename = "dummy_dataframe.parquet"
+    df.to_parquet(parquet_filename, engine="pyarrow", compression="zstd")
 
-    print(f"\nDataFrame successfully saved to {pickle_filename}")
+    print(f"\nDataFrame successfully saved to {parquet_filename}")
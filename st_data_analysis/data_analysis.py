@@ -1,13 +1,22 @@
+import re
+
+import numpy as np
 import pandas as pd
 import plotly.express as px
 import streamlit as st
 
+try:
+    from numba import njit, prange
+except ImportError:  # Numba is optional, without it the substring checks run in Python
+    njit = None
+
 
 def draw_sidebar(df: pd.DataFrame):
+    # Returns the filtered frame and the selection, which identifies the filtered frame cheaply
     st.sidebar.title("Filters")
-    doc_types = df["DocumentType"].unique()
-    input_channels = df["InputChannel"].unique()
-    autoclasses = df["Autoclass"].unique()
+    doc_types = df["DocumentType"].cat.categories
+    input_channels = df["InputChannel"].cat.categories
+    autoclasses = df["Autoclass"].cat.categories
 
     selected_doc_types = st.sidebar.multiselect("Document Type", options=["All"] + list(doc_types), default=["All"])
     selected_input_channels = st.sidebar.multiselect(
@@ -15,28 +24,83 @@ def draw_sidebar(df: pd.DataFrame):
     )
     selected_autoclass = st.sidebar.multiselect("Autoclass", options=["All"] + list(autoclasses), default=["All"])
 
-    filtered_df = df.copy()
+    # Combine all filters into one mask so the frame is sliced only once
+    mask = np.ones(len(df), dtype=bool)
     if "All" not in selected_doc_types:
-        filtered_df = filtered_df.loc[filtered_df["DocumentType"].isin(selected_doc_types)]
+        mask &= df["DocumentType"].isin(selected_doc_types).to_numpy()
     if "All" not in selected_input_channels:
-        filtered_df = filtered_df.loc[filtered_df["InputChannel"].isin(selected_input_channels)]
+        mask &= df["InputChannel"].isin(selected_input_channels).to_numpy()
     if "All" not in selected_autoclass:
-        filtered_df = filtered_df.loc[filtered_df["Autoclass"].isin(selected_autoclass)]
-    return filtered_df
-
-
-def compute_presence_in_text(df: pd.DataFrame, numeric_cols):
-    df = df.copy()
+        mask &= df["Autoclass"].isin(selected_autoclass).to_numpy()
+    selection = (tuple(selected_doc_types), tuple(selected_input_channels), tuple(selected_autoclass))
+    return df.loc[mask], selection
+
+
+def encode_strings(strings):
+    """Concatenates the UTF-8 encoded strings into one byte buffer, returned with each string's offset and length."""
+    encoded = [string.encode("utf-8") for string in strings]
+    lengths = np.fromiter(map(len, encoded), dtype=np.int64, count=len(encoded))
+    offsets = np.zeros(len(encoded), dtype=np.int64)
+    np.cumsum(lengths[:-1], out=offsets[1:])
+    return np.frombuffer(b"".join(encoded), dtype=np.uint8), offsets, lengths
+
+
+if njit is not None:
+
+    @njit(cache=True)
+    def _find_bytes(hay, hay_offset, hay_length, needle, needle_offset, needle_length):
+        for start in range(hay_offset, hay_offset + hay_length - needle_length + 1):
+            found = True
+            for i in range(needle_length):
+                if hay[start + i] != needle[needle_offset + i]:
+                    found = False
+                    break
+            if found:
+                return True
+        return False
+
+    @njit(parallel=True, cache=True)
+    def _contains(needles, needle_offsets, needle_lengths, hay, hay_offsets, hay_lengths):
+        result = np.zeros(len(needle_lengths), dtype=np.bool_)
+        for row in prange(len(needle_lengths)):
+            result[row] = _find_bytes(
+                hay, hay_offsets[row], hay_lengths[row], needles, needle_offsets[row], needle_lengths[row]
+            )
+        return result
+
+
+def compute_presence_in_text(df: pd.DataFrame, numeric_cols, cache_key):
+    # cache_key identifies the content of df, e.g. the data file and the sidebar selection
+    return df.join(_compute_presence(df, numeric_cols, cache_key))
+
+
+@st.cache_data(show_spinner=False)
+def _compute_presence(_df: pd.DataFrame, numeric_cols, cache_key):
+    # The frame is not hashed (leading underscore), the cache is keyed on cache_key instead. Only the small
+    # presence columns are cached, so a cache hit does not unpickle the texts.
+    presence_df = pd.DataFrame(index=_df.index)
+    texts = _df["clean_text"].fillna("").astype(str).to_numpy()
+    if njit is not None:
+        # UTF-8 is self-synchronizing, so a substring match on the bytes is a substring match on the text
+        hay, hay_offsets, hay_lengths = encode_strings(texts)
     for col in numeric_cols:
         presence_col = f"{col}_in_text"
-        df.loc[:, presence_col] = df.apply(
-            lambda row: str(row[col]) in str(row["clean_text"]) if row[col] else False, axis=1
-        )
-    return df
+        values = _df[col].astype("string")
+        # Only rows with a value are checked, the substring test runs over the aligned arrays without row Series
+        idx = (values.notna() & (values != "")).to_numpy().nonzero()[0]
+        presence = np.zeros(len(_df), dtype=bool)
+        if njit is not None:
+            presence[idx] = _contains(*encode_strings(values.to_numpy()[idx]), hay, hay_offsets[idx], hay_lengths[idx])
+        else:
+            presence[idx] = np.fromiter(
+                (value in text for value, text in zip(values.to_numpy()[idx], texts[idx])), dtype=bool, count=len(idx)
+            )
+        presence_df[presence_col] = presence
+    return presence_df
 
 
 def plot_doc_attr_counts(df: pd.DataFrame, numeric_cols):
-    doc_attr_counts = df.groupby("DocumentType")[numeric_cols].count().reset_index()
+    doc_attr_counts = df[numeric_cols].notna().groupby(df["DocumentType"], observed=True).sum().reset_index()
     fig = px.bar(
         doc_attr_counts.melt(id_vars="DocumentType", var_name="Attribute", value_name="Count"),
         x="DocumentType",
@@ -56,7 +120,7 @@ def plot_non_nan_ratio(df: pd.DataFrame, numeric_cols):
 
 
 def plot_non_nan_ratio_by_doc_type(df: pd.DataFrame, numeric_cols):
-    ratio_by_doc = df.groupby("DocumentType")[numeric_cols].apply(lambda x: x.notna().mean()).reset_index()
+    ratio_by_doc = df[numeric_cols].notna().groupby(df["DocumentType"], observed=True).mean().reset_index()
     ratio_melted = ratio_by_doc.melt(id_vars="DocumentType", var_name="Attribute", value_name="Ratio")
     fig = px.bar(
         ratio_melted,
@@ -70,7 +134,7 @@ def plot_non_nan_ratio_by_doc_type(df: pd.DataFrame, numeric_cols):
 
 
 def plot_input_channel_influence(df: pd.DataFrame, numeric_cols):
-    input_attr_counts = df.groupby("InputChannel")[numeric_cols].count().reset_index()
+    input_attr_counts = df[numeric_cols].notna().groupby(df["InputChannel"], observed=True).sum().reset_index()
     fig1 = px.bar(
         input_attr_counts.melt(id_vars="InputChannel", var_name="Attribute", value_name="Count"),
         x="InputChannel",
@@ -81,7 +145,9 @@ def plot_input_channel_influence(df: pd.DataFrame, numeric_cols):
     )
     st.plotly_chart(fig1)
 
-    doc_type_by_input = df.groupby(["InputChannel", "DocumentType"]).size().reset_index(name="Count")
+    doc_type_by_input = df.value_counts(["InputChannel", "DocumentType"]).reset_index(name="Count")
+    # Categorical columns also count combinations that do not occur
+    doc_type_by_input = doc_type_by_input[doc_type_by_input["Count"] > 0]
     fig2 = px.bar(
         doc_type_by_input,
         x="InputChannel",
@@ -93,15 +159,20 @@ def plot_input_channel_influence(df: pd.DataFrame, numeric_cols):
     st.plotly_chart(fig2)
 
 
-def plot_attribute_presence(df: pd.DataFrame, numeric_cols):
+def melt_presence(df: pd.DataFrame, numeric_cols):
     presence_cols = [f"{col}_in_text" for col in numeric_cols]
-    presence_summary = df[[*numeric_cols, *presence_cols, "DocumentType", "InputChannel"]].melt(
+    # Only the presence columns are melted, the numeric values are not needed for the presence rate
+    presence_df = df[[*presence_cols, "DocumentType", "InputChannel"]].melt(
         id_vars=["DocumentType", "InputChannel"], value_name="Value", var_name="Attribute_or_Presence"
     )
-    presence_df = presence_summary[presence_summary["Attribute_or_Presence"].str.endswith("_in_text")].copy()
-    presence_df["Attribute"] = presence_df["Attribute_or_Presence"].str.replace("_in_text", "")
+    presence_df["Attribute"] = presence_df["Attribute_or_Presence"].str.removesuffix("_in_text")
+    return presence_df
 
-    presence_rate = presence_df.groupby(["Attribute", "DocumentType", "InputChannel"])["Value"].mean().reset_index()
+
+def plot_attribute_presence(presence_df: pd.DataFrame):
+    presence_rate = (
+        presence_df.groupby(["Attribute", "DocumentType", "InputChannel"], observed=True)["Value"].mean().reset_index()
+    )
     fig = px.bar(
         presence_rate,
         x="Attribute",
@@ -114,7 +185,7 @@ def plot_attribute_presence(df: pd.DataFrame, numeric_cols):
 
 
 def plot_autoclass_influence(df: pd.DataFrame, numeric_cols):
-    autoclass_df = df.groupby(["Autoclass", "DocumentType"])[numeric_cols].count().reset_index()
+    autoclass_df = df.groupby(["Autoclass", "DocumentType"], observed=True)[numeric_cols].count().reset_index()
     fig = px.bar(
         autoclass_df.melt(id_vars=["Autoclass", "DocumentType"], var_name="Attribute", value_name="Count"),
         x="Autoclass",
@@ -127,6 +198,11 @@ def plot_autoclass_influence(df: pd.DataFrame, numeric_cols):
     st.plotly_chart(fig)
 
 
+def present_attributes(row: pd.Series, numeric_cols):
+    # Missing numbers are read from Parquet as NaN, which is truthy and not None, so they are checked with notna
+    return {col: row[col] for col in numeric_cols if pd.notna(row[col]) and row[col] != ""}
+
+
 def document_explorer(df: pd.DataFrame, numeric_cols):
     st.subheader("Document Explorer")
     doc_ids = df["Document_ID"].unique()
@@ -137,19 +213,19 @@ def document_explorer(df: pd.DataFrame, numeric_cols):
 
         # CHANGED: highlight any numeric attributes found in the text
         text = row["clean_text"]
-        for col in numeric_cols:
-            value = str(row[col]) if row[col] else None
-            if value and value in text:
-                text = text.replace(value, f"<span style='background-color: yellow;'>{value}</span>")
+        # One pass over the text for all values, longer values first so a shorter one cannot shadow them
+        attributes = present_attributes(row, numeric_cols)
+        values = sorted({re.escape(str(value)) for value in attributes.values()}, key=len, reverse=True)
+        if values:
+            pattern = re.compile("|".join(values))
+            text = pattern.sub(lambda m: f"<span style='background-color: yellow;'>{m.group(0)}</span>", text)
 
         # CHANGED: use markdown with unsafe_allow_html to render highlights
         st.markdown(f"**Document Text (ID {selected_id}):**", unsafe_allow_html=True)
         st.markdown(text, unsafe_allow_html=True)
 
         st.write("**Attribute Presence:**")
-        for col in numeric_cols:
-            value = row[col]
-            if value is not None:
-                found_in_text = row[f"{col}_in_text"]
-                msg = f"{col} = {value} (Found in text: {found_in_text})"
-                st.write(msg)
+        for col, value in attributes.items():
+            found_in_text = row[f"{col}_in_text"]
+            msg = f"{col} = {value} (Found in text: {found_in_text})"
+            st.write(msg)
@@ -0,0 +1,29 @@
+import os
+import shutil
+import tempfile
+import unittest
+
+import pandas as pd
+
+from st_data_analysis.data_analysis import present_attributes
+
+
+class TestDataAnalysis(unittest.TestCase):
+
+    def setUp(self):
+        # Create a temporary directory for file operations
+        self.test_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.test_dir)
+
+    def test_present_attributes_missing_value(self):
+        # Missing numbers are written as nulls and read back from Parquet like in the dashboard
+        parquet_file = os.path.join(self.test_dir, "test.parquet")
+        df = pd.DataFrame({"Number1": ["12345", "67890"], "Number2": [None, "1234567"], "Number3": ["", ""]})
+        df.to_parquet(parquet_file, engine="pyarrow")
+        row = pd.read_parquet(parquet_file).iloc[0]
+        result = present_attributes(row, ["Number1", "Number2", "Number3"])
+        self.assertEqual(result, {"Number1": "12345"})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -2,24 +2,27 @@ import os
 import shutil
 import tempfile
 import unittest
+import zipfile
 
 import pandas as pd
-import spacy
 
 from preprocessing.prepare_data import (
     anonymize_text,
+    anonymize_texts,
     chunks,
     get_text_file_path,
     is_blacklisted,
     is_expected_format,
+    parse_index_contents,
     parse_index_file,
     process_index_files,
+    process_zip_documents,
     read_text_file,
     remove_common_phrases,
+    set_blacklist,
+    substitute_patterns,
 )
 
-nlp = spacy.load("de_core_news_md")
-
 
 class TestPrepareData(unittest.TestCase):
 
@@ -40,6 +43,7 @@ class TestPrepareData(unittest.TestCase):
             "Max Mustermann"
         )
         self.blacklist_emails = {"blacklisted@example.com"}
+        set_blacklist(self.blacklist_emails)
 
     def test_parse_index_file(self):
         # Write index file to temporary directory
@@ -57,6 +61,20 @@ class TestPrepareData(unittest.TestCase):
         result = parse_index_file(index_file_path)
         self.assertEqual(result, expected_data)
 
+    def test_parse_index_contents_malformed_file(self):
+        # An unterminated quote in one file must not shift the results of the following files
+        valid = '"zipname","filename","{Batch ID}","Batch_001","{Document ID}","DOC","docType","bill",""'
+        contents = [
+            valid.replace("DOC", "Doc_00001"),
+            '"zipname","filename","{Batch ID}","Batch_001","broken',
+            valid.replace("DOC", "Doc_00003"),
+        ]
+        result = parse_index_contents(contents, ["first", "second", "third"])
+        self.assertEqual(len(result), 3)
+        self.assertEqual(result[0]["{Document ID}"], "Doc_00001")
+        self.assertEqual(result[1], {})
+        self.assertEqual(result[2]["{Document ID}"], "Doc_00003")
+
     def test_is_expected_format(self):
         data = {
             "BATCHKLASSE": "zipname",
@@ -85,10 +103,15 @@ class TestPrepareData(unittest.TestCase):
         self.assertEqual(result, self.text_file_content)
 
     def test_is_blacklisted(self):
-        text = "Contact me at blacklisted@example.com"
-        self.assertTrue(is_blacklisted(text, self.blacklist_emails))
-        text = "Contact me at allowed@example.com"
-        self.assertFalse(is_blacklisted(text, self.blacklist_emails))
+        text = b"Contact me at blacklisted@example.com"
+        self.assertTrue(is_blacklisted(text))
+        text = b"Contact me at Blacklisted@Example.com"
+        self.assertTrue(is_blacklisted(text))
+        set_blacklist(set())
+        self.assertFalse(is_blacklisted(text))
+        set_blacklist(self.blacklist_emails)
+        text = b"Contact me at allowed@example.com"
+        self.assertFalse(is_blacklisted(text))
 
     def test_remove_common_phrases(self):
         text = "Sehr geehrte Damen und Herren,\n\n" "Dies ist ein Test.\n\n" "Mit freundlichen Grüßen,\n" "Tester"
@@ -96,6 +119,13 @@ class TestPrepareData(unittest.TestCase):
         result = remove_common_phrases(text)
         self.assertEqual(result, expected)
 
+    def test_substitute_patterns_unicode(self):
+        # Umlauts are part of the email address and NBSP separates phone numbers in OCR text
+        result = substitute_patterns("Mail an müller@firma.de oder jürgen.groß@straße.de")
+        self.assertEqual(result, "Mail an [REDACTED_EMAIL_PATTERN] oder [REDACTED_EMAIL_PATTERN]")
+        result = substitute_patterns("Tel. 0123\u00a04567\u00a0890")
+        self.assertEqual(result, "Tel. [REDACTED_PHONE_PATTERN]")
+
     def test_anonymize_text(self):
         text = (
             "Mein Name ist Max Mustermann und ich wohne in Berlin. "
@@ -104,6 +134,15 @@ class TestPrepareData(unittest.TestCase):
         result = anonymize_text(text)
         self.assertTrue("Max Mustermann" not in result)
 
+    def test_anonymize_texts(self):
+        texts = [self.text_file_content, "Dies ist ein Test."]
+        result = anonymize_texts(texts)
+        self.assertEqual(len(result), 2)
+        self.assertTrue(result[0].startswith("[REDACTED_PHRASE],"))
+        self.assertTrue("Max Mustermann" not in result[0])
+        self.assertTrue("max.mustermann@example.com" not in result[0])
+        self.assertEqual(result[1], "Dies ist ein Test.")
+
     def test_process_index_files(self):
         # Set up index and text files
         index_file_path = os.path.join(self.test_dir, "test_index.txt")
@@ -117,12 +156,54 @@ class TestPrepareData(unittest.TestCase):
         os.makedirs(output_dir, exist_ok=True)
         index_files_chunk = [index_file_path]
         chunk_number = 0
-        process_index_files(index_files_chunk, chunk_number, output_dir, self.blacklist_emails)
+        process_index_files(index_files_chunk, chunk_number, output_dir)
+        # Check output
+        parquet_file = os.path.join(output_dir, "final_dataframes", f"dataframe_chunk_{chunk_number}.parquet")
+        self.assertTrue(os.path.exists(parquet_file))
+        df = pd.read_parquet(parquet_file)
+        self.assertEqual(len(df), 1)
+
+    def test_process_index_files_undecodable_text(self):
+        # An OCR file that is not UTF-8 is logged and read as empty text, the index row is kept
+        index_file_path = os.path.join(self.test_dir, "test_index.txt")
+        with open(index_file_path, "w", encoding="utf-8") as f:
+            f.write(
+                '"zipname","filename","{Batch ID}","Batch_001","{Document ID}","Doc_00001",'
+                '"docType","bill","{pageCount}","5",""'
+            )
+        with open(os.path.join(self.test_dir, "test.txt"), "wb") as f:
+            f.write("Mit freundlichen Grüßen".encode("latin-1"))
+        output_dir = os.path.join(self.test_dir, "output")
+        process_index_files([index_file_path], 0, output_dir)
+        df = pd.read_parquet(os.path.join(output_dir, "final_dataframes", "dataframe_chunk_0.parquet"))
+        self.assertEqual(len(df), 1)
+        self.assertEqual(df.loc[0, "{Document ID}"], "Doc_00001")
+        self.assertEqual(df.loc[0, "text"], "")
+
+    def test_process_zip_documents(self):
+        # Set up a zip file with one index and text file, the index file as written by create_dummy_data
+        zip_index_content = (
+            '"zipname","filename","{Batch ID}","Batch_001","{Document ID}","Doc_00001",'
+            '"docType","bill","{pageCount}","5",""'
+        )
+        zip_path = os.path.join(self.test_dir, "test.zip")
+        with zipfile.ZipFile(zip_path, "w") as zipf:
+            zipf.writestr("Batch_001/Doc_00001/test_index.txt", zip_index_content)
+            zipf.writestr("Batch_001/Doc_00001/test.txt", self.text_file_content)
+        # Run process_zip_documents
+        output_dir = os.path.join(self.test_dir, "output")
+        chunk_number = 0
+        process_zip_documents(zip_path, ["Batch_001/Doc_00001/test_index.txt"], chunk_number, output_dir)
         # Check output
-        pickle_file = os.path.join(output_dir, "final_dataframes", f"dataframe_chunk_{chunk_number}.pkl")
-        self.assertTrue(os.path.exists(pickle_file))
-        df = pd.read_pickle(pickle_file)
+        parquet_file = os.path.join(output_dir, "final_dataframes", f"dataframe_chunk_{chunk_number}.parquet")
+        self.assertTrue(os.path.exists(parquet_file))
+        df = pd.read_parquet(parquet_file)
         self.assertEqual(len(df), 1)
+        self.assertEqual(df.loc[0, "{Document ID}"], "Doc_00001")
+        text = df.loc[0, "text"]
+        self.assertTrue(text.startswith("[REDACTED_PHRASE],"))
+        self.assertIn("[REDACTED_EMAIL_PATTERN]", text)
+        self.assertNotIn("max.mustermann@example.com", text)
 
     def test_chunks(self):
         lst = list(range(10))
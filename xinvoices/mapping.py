@@ -1,17 +1,35 @@
 import re
+from typing import Iterator, Tuple
 
 import lxml.etree as ET
 import pandas as pd
 
+XSL_TEMPLATE = "{http://www.w3.org/1999/XSL/Transform}template"
+# Predicates in match attributes, e.g. [preceding-sibling::...]. The negated class avoids the backtracking of .*?
+BRACKET_PATTERN = re.compile(r"\[[^\]]*\]")
 
-def extract_mode_mapping(cii_path: str) -> dict:
-    tree = ET.parse(cii_path)
-    root = tree.getroot()
-    ns = {"xsl": "http://www.w3.org/1999/XSL/Transform"}
+
+def iter_elements(path: str, tag: str) -> Iterator[ET._Element]:
+    """
+    Streams the elements with the given tag, freeing each one and its processed
+    siblings once the caller is done with it, so the full tree is never held in memory.
+    """
+    for _, elem in ET.iterparse(path, events=("end",), tag=tag):
+        yield elem
+        elem.clear()
+        while elem.getprevious() is not None:
+            del elem.getparent()[0]
+
+
+def extract_mode_mappings(cii_path: str) -> Tuple[dict, dict]:
+    """
+    Extracts both the mode to child tag mapping and the mode to line name mapping
+    (see extract_mode_line_mapping) from a single parse of the XSL file.
+    """
     mapping = {}
+    line_mapping = {}
 
-    templates = root.xpath("//xsl:template", namespaces=ns)
-    for tmpl in templates:
+    for tmpl in iter_elements(cii_path, XSL_TEMPLATE):
         mode = tmpl.get("mode")
         if not mode:
             continue
@@ -19,15 +37,27 @@ def extract_mode_mapping(cii_path: str) -> dict:
         if children:
             child_tag = ET.QName(children[0]).localname
             mapping[mode] = child_tag
-    return mapping
 
+        match_attr = tmpl.get("match")
+        if not match_attr:
+            continue
+        # Take the final segment after the last '/'
+        last_segment = match_attr.strip().split("/")[-1]
+        # Remove anything in brackets (e.g. [preceding-sibling::...])
+        last_segment = BRACKET_PATTERN.sub("", last_segment)
+        # Remove namespace prefix if present
+        tag = last_segment.split(":")[-1]
+        line_mapping[mode] = tag.strip()
+    return mapping, line_mapping
 
-def extract_id_mapping(xml_path: str) -> dict:
-    tree = ET.parse(xml_path)
-    root = tree.getroot()
 
+def extract_mode_mapping(cii_path: str) -> dict:
+    return extract_mode_mappings(cii_path)[0]
+
+
+def extract_id_mapping(xml_path: str) -> dict:
     result = {}
-    for entry in root.findall("entry"):
+    for entry in iter_elements(xml_path, "entry"):
         item_id = entry.get("id")
         item_key = entry.get("key")
         if item_id and item_key:
@@ -39,11 +69,8 @@ def extract_id_mapping(xml_path: str) -> dict:
 
 
 def extract_id_to_value_mapping(xml_path: str) -> dict:
-    tree = ET.parse(xml_path)
-    root = tree.getroot()
-
     result = {}
-    for entry in root.findall("entry"):
+    for entry in iter_elements(xml_path, "entry"):
         item_id = entry.get("id")
         item_value = entry.text.strip() if entry.text else None
         if item_id and item_value:
@@ -58,72 +85,33 @@ def extract_mode_line_mapping(cii_path: str) -> dict:
     removing namespace prefixes and any predicates (e.g. [preceding-sibling::...]).
     Example: {"BT-99": "Amount", ...}
     """
-    tree = ET.parse(cii_path)
-    root = tree.getroot()
-    ns = {"xsl": "http://www.w3.org/1999/XSL/Transform"}
-    mapping = {}
-
-    templates = root.xpath("//xsl:template", namespaces=ns)
-    for tmpl in templates:
-        mode = tmpl.get("mode")
-        match_attr = tmpl.get("match")
-        if not mode or not match_attr:
-            continue
-        # Take the final segment after the last '/'
-        last_segment = match_attr.strip().split("/")[-1]
-        # Remove anything in brackets (e.g. [preceding-sibling::...])
-        last_segment = re.sub(r"\[.*?\]", "", last_segment)
-        # Remove namespace prefix if present
-        tag = last_segment.split(":")[-1]
-        mapping[mode] = tag.strip()
-    return mapping
+    return extract_mode_mappings(cii_path)[1]
 
 
 def combine(cii_xsl_path: str, ubl_invoice_xsl_path: str, ubl_creditnote_xsl_path: str, xml_path: str):
-    dict1_cii = extract_mode_mapping(cii_xsl_path)
-    dict4_cii = extract_mode_line_mapping(cii_xsl_path)
-
-    dict1_invoice = extract_mode_mapping(ubl_invoice_xsl_path)
-    dict4_invoice = extract_mode_line_mapping(ubl_invoice_xsl_path)
-
-    dict1_credit = extract_mode_mapping(ubl_creditnote_xsl_path)
-    dict4_credit = extract_mode_line_mapping(ubl_creditnote_xsl_path)
+    # Each XSL file is parsed once for both mappings
+    dict1_cii, dict4_cii = extract_mode_mappings(cii_xsl_path)
+    dict1_invoice, dict4_invoice = extract_mode_mappings(ubl_invoice_xsl_path)
+    dict1_credit, dict4_credit = extract_mode_mappings(ubl_creditnote_xsl_path)
 
     dict2 = extract_id_mapping(xml_path)
     dict3 = extract_id_to_value_mapping(xml_path)
 
     all_ids = set(dict1_cii.keys()) | set(dict1_invoice.keys()) | set(dict1_credit.keys())
 
-    rows = []
-    for mode_id in sorted(all_ids):
-        rows.append(
-            {
-                "ID": mode_id,
-                "Key_Cii": dict1_cii.get(mode_id, ""),
-                "LineName_Cii": dict4_cii.get(mode_id, ""),
-                "Key_UblInvoice": dict1_invoice.get(mode_id, ""),
-                "LineName_UblInvoice": dict4_invoice.get(mode_id, ""),
-                "Key_UblCreditNote": dict1_credit.get(mode_id, ""),
-                "LineName_UblCreditNote": dict4_credit.get(mode_id, ""),
-                "XML Key": dict2.get(mode_id, ""),
-                "XML Value": dict3.get(mode_id, ""),
-            }
-        )
-
-    df = pd.DataFrame(
-        rows,
-        columns=[
-            "ID",
-            "Key_Cii",
-            "LineName_Cii",
-            "Key_UblInvoice",
-            "LineName_UblInvoice",
-            "Key_UblCreditNote",
-            "LineName_UblCreditNote",
-            "XML Key",
-            "XML Value",
-        ],
-    )
+    ids = sorted(all_ids)
+    # Build the frame column by column, the lookups are already keyed by ID
+    columns = {
+        "Key_Cii": dict1_cii,
+        "LineName_Cii": dict4_cii,
+        "Key_UblInvoice": dict1_invoice,
+        "LineName_UblInvoice": dict4_invoice,
+        "Key_UblCreditNote": dict1_credit,
+        "LineName_UblCreditNote": dict4_credit,
+        "XML Key": dict2,
+        "XML Value": dict3,
+    }
+    df = pd.DataFrame({"ID": ids, **{name: [lookup.get(i, "") for i in ids] for name, lookup in columns.items()}})
     return df
 
 
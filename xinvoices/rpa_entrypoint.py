@@ -2,7 +2,7 @@ import argparse
 import logging
 import os
 
-from transformation import convert_html_to_pdf, transform_xml
+from transformation import convert_html_to_pdf, transform_xml_file
 
 
 def parse_arguments():
@@ -13,7 +13,7 @@ def parse_arguments():
         description="Transform a single XML to HTML and then to PDF using Saxon/C and WeasyPrint."
     )
     parser.add_argument("--xml-file", required=True, help="Path to the input XML file")
-    parser.add_argument("--html-file", required=True, help="Path to the output HTML file")
+    parser.add_argument("--html-file", help="(Optional) Path to save the intermediate HTML file")
     parser.add_argument("--pdf-file", required=True, help="Path to the output PDF file")
     parser.add_argument("--xsl-dir", required=True, help="Directory containing XSLT stylesheets")
     parser.add_argument("--lang", default="de", help="Language parameter for the transformation (default: de)")
@@ -23,23 +23,11 @@ def parse_arguments():
     return parser.parse_args()
 
 
-def main():
+def run(xml_file, pdf_file, xsl_dir, params, html_file=None):
     """
-    Main function to handle the transformation process for RPA bot.
+    Transforms a single XML to HTML and then to PDF. Can be imported by a long-running worker,
+    which then keeps the Saxon/C processor and the compiled stylesheets between documents.
     """
-    # Parse the input arguments
-    args = parse_arguments()
-
-    # Configure logging
-    logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
-
-    # Extract arguments
-    xml_file = args.xml_file
-    html_file = args.html_file
-    pdf_file = args.pdf_file
-    xsl_dir = args.xsl_dir
-    params = {"lang": args.lang, "invoiceline-layout": args.invoiceline_layout}
-
     # Validate input XML file
     if not os.path.isfile(xml_file):
         logging.error(f"Input XML file '{xml_file}' does not exist.")
@@ -52,15 +40,33 @@ def main():
 
     # Perform the XML to HTML transformation
     logging.info("Starting XML to HTML transformation...")
-    transform_xml(xml_file, html_file, xsl_dir, params)
+    # The HTML is kept in memory, it is only written to disk if an HTML file is requested
+    html = transform_xml_file(xml_file, None, xsl_dir, params)
+    if html_file:
+        with open(html_file, "w", encoding="utf-8") as f:
+            f.write(html)
     logging.info("XML to HTML transformation completed.")
 
     # Convert HTML to PDF
     logging.info("Starting HTML to PDF conversion...")
-    convert_html_to_pdf(html_file, pdf_file)
+    convert_html_to_pdf(html, pdf_file)
     logging.info("HTML to PDF conversion completed.")
 
 
+def main():
+    """
+    Main function to handle the transformation process for RPA bot.
+    """
+    # Parse the input arguments
+    args = parse_arguments()
+
+    # Configure logging
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+
+    params = {"lang": args.lang, "invoiceline-layout": args.invoiceline_layout}
+    run(args.xml_file, args.pdf_file, args.xsl_dir, params, args.html_file)
+
+
 if __name__ == "__main__":
     main()
     # python rpa_entrypoint.py --xml-file path/to/input.xml --html-file path/to/output.html --pdf-file path/to/output.pdf --xsl-dir path/to/xslt-directory
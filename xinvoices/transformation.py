@@ -1,5 +1,10 @@
+import atexit
 import logging
 import os
+import re
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+from itertools import repeat
 
 from saxoncee import PySaxonProcessor
 
@@ -8,38 +13,72 @@ from saxoncee import PySaxonProcessor
 # Configure logging
 logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
 
+# Stylesheet of the first transformation step by local name of the root element
+ROOT_STYLESHEETS = {
+    b"CrossIndustryInvoice": "cii-xr.xsl",
+    b"CreditNote": "ubl-creditnote-xr.xsl",
+    b"Invoice": "ubl-invoice-xr.xsl",
+}
+# First start tag, skipping the XML declaration, processing instructions and the doctype, with optional prefix
+ROOT_TAG_PATTERN = re.compile(rb"<(?![?!])(?:[\w.-]+:)?([\w.-]+)")
+COMMENT_PATTERN = re.compile(rb"<!--.*?-->", re.DOTALL)
+
+# Saxon/C state of the current process, created on first use by _get_processor and reused by later calls
+saxon_processor = None
+xslt_processor = None
+compiled_stylesheets = {}
+
+
+@lru_cache(maxsize=None)
+def _stylesheet_path(xsl_dir, stylesheet_name):
+    """
+    Returns the path of a stylesheet in the XSL directory, joined only once per stylesheet.
+    """
+    return os.path.join(xsl_dir, stylesheet_name)
+
 
 def _determine_stylesheet(xml_path, xsl_dir):
     """
     Determine the appropriate XSLT stylesheet for the given XML file based on its root element.
     """
-    with open(xml_path, "r", encoding="utf-8") as f:
-        for _ in range(10):
-            line = f.readline()
-            if "CrossIndustryInvoice" in line:
-                return os.path.join(xsl_dir, "cii-xr.xsl")
-            elif "Invoice" in line:
-                return os.path.join(xsl_dir, "ubl-invoice-xr.xsl")
-            elif "CreditNote" in line:
-                return os.path.join(xsl_dir, "ubl-creditnote-xr.xsl")
+    # The root element is within the first block, the bytes are searched without decoding
+    with open(xml_path, "rb") as f:
+        head = f.read(4096)
+    # The root is the first start tag after the XML declaration, doctype and comments
+    match = ROOT_TAG_PATTERN.search(COMMENT_PATTERN.sub(b"", head))
+    if match and match.group(1) in ROOT_STYLESHEETS:
+        return _stylesheet_path(xsl_dir, ROOT_STYLESHEETS[match.group(1)])
 
     logging.error(f"Could not determine the root element of '{xml_path}'")
     raise ValueError(f"Could not determine the root element of '{xml_path}'")
 
 
-def _compile_and_transform(processor, stylesheet_path, source_file, output_file, params):
+def _get_executable(processor, stylesheet_path, compiled):
     """
-    Compiles an XSLT stylesheet and transforms an XML file.
+    Returns the compiled XSLT executable for a stylesheet, compiling it only on first use.
 
-    :param processor: PySaxonProcessor object for handling the transformation.
+    :param processor: Xslt30Processor used to compile the stylesheet.
     :param stylesheet_path: Path to the XSLT stylesheet.
-    :param source_file: Path to the input XML file.
-    :param output_file: Path to the output file.
-    :param params: Dictionary of parameters to pass to the XSLT stylesheet.
+    :param compiled: Dictionary of already compiled executables keyed by stylesheet path.
+    """
+    xslt_executable = compiled.get(stylesheet_path)
+    if xslt_executable is None:
+        logging.info(f"Compiling XSLT stylesheet: {stylesheet_path}")
+        xslt_executable = processor.compile_stylesheet(stylesheet_file=stylesheet_path)
+        compiled[stylesheet_path] = xslt_executable
+    return xslt_executable
+
+
+def _set_parameters(processor, xslt_executable, params):
     """
-    logging.info(f"Compiling XSLT stylesheet: {stylesheet_path}")
-    xslt_executable = processor.compile_stylesheet(stylesheet_file=stylesheet_path)
+    Sets the parameters of a compiled XSLT stylesheet, replacing those of earlier transformations.
 
+    :param processor: PySaxonProcessor object for handling the transformation.
+    :param xslt_executable: Compiled XSLT stylesheet.
+    :param params: Dictionary of parameters to pass to the XSLT stylesheet.
+    """
+    # Executables are cached for the whole process, drop the parameters of the previous transformation
+    xslt_executable.clear_parameters()
     # Set parameters if provided
     if params:
         for key, value in params.items():
@@ -48,12 +87,85 @@ def _compile_and_transform(processor, stylesheet_path, source_file, output_file,
             xslt_executable.set_parameter(key, xdm_value)
             logging.debug(f"Set parameter for transformation: {key} = {value}")
 
-    logging.info(f"Transforming '{source_file}' to '{output_file}' using XSLT.")
-    xslt_executable.transform_to_file(source_file=source_file, output_file=output_file)
-    logging.info(f"Transformation for {stylesheet_path} completed successfully.")
 
+def _transform_to_node(processor, xslt_executable, source_file, params):
+    """
+    Transforms an XML file with an already compiled XSLT stylesheet and returns the result document in memory.
 
-def transform_xml(xml_dir, html_dir, xsl_dir, params=None):
+    :param processor: PySaxonProcessor object for handling the transformation.
+    :param xslt_executable: Compiled XSLT stylesheet.
+    :param source_file: Path to the input XML file.
+    :param params: Dictionary of parameters to pass to the XSLT stylesheet.
+    """
+    _set_parameters(processor, xslt_executable, params)
+    logging.info(f"Transforming '{source_file}' in memory using XSLT.")
+    return xslt_executable.transform_to_value(source_file=source_file).head.get_node_value()
+
+
+def _transform_node(processor, xslt_executable, xdm_node, output_file, params):
+    """
+    Transforms an in-memory XML document with an already compiled XSLT stylesheet.
+
+    :param processor: PySaxonProcessor object for handling the transformation.
+    :param xslt_executable: Compiled XSLT stylesheet.
+    :param xdm_node: PyXdmNode of the input document.
+    :param output_file: Path to the output file. If None, the result is returned as string instead.
+    :param params: Dictionary of parameters to pass to the XSLT stylesheet.
+    """
+    _set_parameters(processor, xslt_executable, params)
+    if output_file is None:
+        logging.info("Transforming to string using XSLT.")
+        return xslt_executable.transform_to_string(xdm_node=xdm_node)
+
+    logging.info(f"Transforming to '{output_file}' using XSLT.")
+    xslt_executable.transform_to_file(xdm_node=xdm_node, output_file=output_file)
+    logging.info(f"Transformation to '{output_file}' completed successfully.")
+
+
+def _get_processor():
+    """
+    Returns the Saxon/C processor and XSLT processor of the current process, starting them on first use.
+    Starting Saxon/C dominates the run time of a single small invoice, so it is only done once per process.
+    """
+    global saxon_processor, xslt_processor
+    if saxon_processor is None:
+        saxon_processor = PySaxonProcessor(license=False).__enter__()
+        xslt_processor = saxon_processor.new_xslt30_processor()
+        atexit.register(saxon_processor.__exit__, None, None, None)
+        logging.info(f"Saxon/C Processor Version: {saxon_processor.version}")
+    return saxon_processor, xslt_processor
+
+
+def transform_xml_file(xml_path, html_path, xsl_dir, params=None, intermediate_path=None):
+    """
+    Transforms a single XML file to HTML using the two-step XSLT process.
+    The intermediate XR document is passed between the steps in memory.
+
+    :param xml_path: Path to the input XML file.
+    :param html_path: Path where the output HTML file will be saved. If None, the HTML is returned as string.
+    :param xsl_dir: Directory containing XSLT stylesheets.
+    :param params: (Optional) Dictionary of parameters to pass to the XSLT stylesheets.
+    :param intermediate_path: (Optional) Path where the intermediate XR file is saved for debugging.
+    """
+    logging.info(f"Processing file: {xml_path}")
+    processor, xslt = _get_processor()
+
+    stylesheet_filename = _determine_stylesheet(xml_path, xsl_dir)
+
+    # Step 1: Transform to intermediate XR format
+    first_executable = _get_executable(xslt, stylesheet_filename, compiled_stylesheets)
+    xr_node = _transform_to_node(processor, first_executable, xml_path, params)
+    if intermediate_path:
+        with open(intermediate_path, "w", encoding="utf-8") as f:
+            f.write(str(xr_node))
+
+    # Step 2: Transform to HTML
+    second_xsl = _stylesheet_path(xsl_dir, "xrechnung-html.xsl")
+    second_executable = _get_executable(xslt, second_xsl, compiled_stylesheets)
+    return _transform_node(processor, second_executable, xr_node, html_path, params)
+
+
+def transform_xml(xml_dir, html_dir, xsl_dir, params=None, keep_intermediate=False):
     """
     Transforms XML files in a specified directory to HTML using a two-step XSLT process.
 
@@ -61,38 +173,49 @@ def transform_xml(xml_dir, html_dir, xsl_dir, params=None):
     :param html_dir: Directory where output HTML files will be saved.
     :param xsl_dir: Directory containing XSLT stylesheets.
     :param params: (Optional) Dictionary of parameters to pass to the XSLT stylesheets.
+    :param keep_intermediate: (Optional) Also save the intermediate XR files, for debugging.
     """
-    # Initialize the Saxon/C Processor
-    with PySaxonProcessor(license=False) as proc:
-        logging.info(f"Saxon/C Processor Version: {proc.version}")
-
-        xslt_processor = proc.new_xslt30_processor()
-
-        # Ensure the output directories exist
-        os.makedirs(html_dir, exist_ok=True)
+    # Ensure the output directories exist
+    os.makedirs(html_dir, exist_ok=True)
+    intermediate_dir = None
+    if keep_intermediate:
         intermediate_dir = os.path.join(html_dir, os.pardir, "xr")
         os.makedirs(intermediate_dir, exist_ok=True)
         logging.info(f"Output directories ensured: {html_dir}, {intermediate_dir}")
+    else:
+        logging.info(f"Output directory ensured: {html_dir}")
+
+    # Collect the input files and derive all output paths up front
+    xml_paths, html_paths, intermediate_paths = [], [], []
+    with os.scandir(xml_dir) as it:
+        for entry in it:
+            if entry.is_file() and entry.name.lower().endswith(".xml"):
+                stem = entry.name[:-4]
+                xml_paths.append(entry.path)
+                html_paths.append(os.path.join(html_dir, f"{stem}.html"))
+                intermediate_paths.append(
+                    os.path.join(intermediate_dir, f"{stem}-xr.xml") if intermediate_dir else None
+                )
+
+    # Files are independent of each other, each worker process starts its own Saxon/C processor once
+    with ProcessPoolExecutor(initializer=_get_processor) as executor:
+        list(
+            executor.map(transform_xml_file, xml_paths, html_paths, repeat(xsl_dir), repeat(params), intermediate_paths)
+        )
+
+
+def convert_html_to_pdf(html, pdf_path, base_url=None):
+    """
+    Converts an HTML document held in memory to PDF using WeasyPrint.
 
-        # Iterate over each XML file in the input directory
-        for filename in os.listdir(xml_dir):
-            if filename.lower().endswith(".xml"):
-                xml_path = os.path.join(xml_dir, filename)
-                logging.info(f"Processing file: {xml_path}")
-
-                stylesheet_filename = _determine_stylesheet(xml_path, xsl_dir)
-
-                # Intermediate XML filename
-                intermediate_path = os.path.join(intermediate_dir, f"{filename[:-4]}-xr.xml")
-
-                # Step 1: Transform to intermediate XR format
-                _compile_and_transform(xslt_processor, stylesheet_filename, xml_path, intermediate_path, params)
+    :param html: HTML document as str or bytes.
+    :param pdf_path: Path where the output PDF file will be saved.
+    :param base_url: (Optional) Base URL to resolve relative resources of the HTML document.
+    """
+    from weasyprint import HTML
 
-                # Step 2: Transform to HTML
-                second_xsl = os.path.join(xsl_dir, "xrechnung-html.xsl")
-                html_filename = f"{filename[:-4]}.html"
-                html_path = os.path.join(html_dir, html_filename)
-                _compile_and_transform(xslt_processor, second_xsl, intermediate_path, html_path, params)
+    logging.info(f"Converting HTML to PDF at '{pdf_path}'")
+    HTML(string=html, base_url=base_url).write_pdf(pdf_path)
 
 
 # def convert_html_to_pdf(html_dir, pdf_dir):
@@ -107,15 +230,17 @@ def transform_xml(xml_dir, html_dir, xsl_dir, params=None):
 #     logging.info(f"PDF output directory ensured: {pdf_dir}")
 
 #     # Iterate over each HTML file in the input directory
-#     for filename in os.listdir(html_dir):
-#         if filename.lower().endswith(".html"):
-#             html_path = os.path.join(html_dir, filename)
-#             pdf_filename = f"{filename[:-5]}.pdf"  # Replace .html with .pdf
-#             pdf_path = os.path.join(pdf_dir, pdf_filename)
+#     with os.scandir(html_dir) as it:
+#         html_entries = [entry for entry in it if entry.is_file() and entry.name.lower().endswith(".html")]
+#     for entry in html_entries:
+#         filename = entry.name
+#         html_path = entry.path
+#         pdf_filename = f"{filename[:-5]}.pdf"  # Replace .html with .pdf
+#         pdf_path = os.path.join(pdf_dir, pdf_filename)
 
-#             logging.info(f"Converting '{html_path}' to PDF at '{pdf_path}'")
-#             HTML(html_path).write_pdf(pdf_path)
-#             logging.info(f"Converted '{filename}' to '{pdf_filename}'.")
+#         logging.info(f"Converting '{html_path}' to PDF at '{pdf_path}'")
+#         HTML(html_path).write_pdf(pdf_path)
+#         logging.info(f"Converted '{filename}' to '{pdf_filename}'.")
 
 
 if __name__ == "__main__":
@@ -132,6 +257,13 @@ if __name__ == "__main__":
     transform_xml(xml_dir, html_dir, xsl_dir)
 
     print("Converting HTML to PDF using WeasyPrint...")
-    convert_html_to_pdf(html_dir, pdf_dir)
+    os.makedirs(pdf_dir, exist_ok=True)
+    with os.scandir(html_dir) as it:
+        html_entries = [entry for entry in it if entry.is_file() and entry.name.lower().endswith(".html")]
+    for entry in html_entries:
+        with open(entry.path, encoding="utf-8") as f:
+            html = f.read()
+        # Relative resources of the HTML file are resolved against its own location
+        convert_html_to_pdf(html, os.path.join(pdf_dir, f"{entry.name[:-5]}.pdf"), base_url=entry.path)
 
     print("Transformation and PDF generation complete.")
@@ -4,14 +4,20 @@ This file is the legacy implementation that just investigated the creation of PD
 No future usage is intented for this file.
 """
 
+import asyncio
 import datetime
+import io
 import os
 import warnings
-import xml.etree.ElementTree as ET
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache, partial
+from pathlib import Path
 
+import lxml.etree as ET
+import numpy as np
 from reportlab.lib import colors
 from reportlab.lib.pagesizes import A4
-from reportlab.lib.styles import getSampleStyleSheet
+from reportlab.lib.styles import ParagraphStyle, getSampleStyleSheet
 from reportlab.pdfgen import canvas
 from reportlab.platypus import Paragraph, SimpleDocTemplate, Spacer, Table, TableStyle
 
@@ -27,7 +33,12 @@ PAGE_WIDTH, PAGE_HEIGHT = A4
 FONT_NAME = "Helvetica"
 FONT_SIZE_NORMAL = 11
 FONT_SIZE_SMALL = 9
+FOOTER_LEADING = 12
 CURRENCY = "EUR"
+# Bound format method for amounts with two decimals, cheaper than an f-string per value
+_fmt2 = "{:.2f}".format
+# Allowed difference between the totals and the values computed from the articles, one cent for rounding
+TOTALS_TOLERANCE = 0.01
 ICCPROFILE_FILE = "sRGB2014.icc"
 XMP_METADATA_FILE = "ZUGFeRD2_extension_schema.xmp"
 XML_INPUT_FILE = os.path.join("xinvoices", "zugferd_invoice.xml")
@@ -52,6 +63,53 @@ company_info = {
     "iban": "IBAN DE28700100809999999999",
 }
 
+# Texts built from the static company information, they are the same for every invoice
+SELLER_ADDRESS_TEXT = f"""{company_info['name']}<br/>
+    {company_info['street']}<br/>
+    {company_info['postcode']} {company_info['city']}<br/>
+    {company_info['country']}<br/>
+    Tel. {company_info['phone']}<br/>
+    Fax {company_info['fax']}<br/>
+    {company_info['email']}<br/>
+    {company_info['url']}"""
+COMPANY_FOOTER_LINES = (
+    f"{company_info['name']} • Sitz der Gesellschaft • USt-IdNr • {company_info['bank_name']}",
+    f"{company_info['director']} • {company_info['company_registration']} • "
+    f"{company_info['vat_id']} • {company_info['iban']}",
+)
+
+# Table styles, they are the same for every invoice and only built once
+INVOICE_DETAILS_TABLE_STYLE = TableStyle(
+    [
+        ("ALIGN", (0, 0), (-1, -1), "LEFT"),
+        ("FONT", (0, 0), (-1, -1), FONT_NAME, FONT_SIZE_NORMAL),
+        ("VALIGN", (0, 0), (-1, -1), "MIDDLE"),
+        ("TOPPADDING", (0, 0), (-1, -1), 2),
+        ("BOTTOMPADDING", (0, 0), (-1, -1), 2),
+    ]
+)
+ARTICLES_TABLE_STYLE = TableStyle(
+    [
+        ("GRID", (0, 0), (-1, -1), 0.5, colors.black),
+        ("FONT", (0, 0), (-1, -1), FONT_NAME, FONT_SIZE_NORMAL),
+        ("ALIGN", (0, 0), (-1, 0), "CENTER"),
+        ("BACKGROUND", (0, 0), (-1, 0), colors.lightgrey),
+        ("ALIGN", (0, 1), (0, -1), "RIGHT"),
+        ("ALIGN", (2, 1), (-1, -1), "RIGHT"),
+        ("TOPPADDING", (0, 0), (-1, -1), 2),
+        ("BOTTOMPADDING", (0, 0), (-1, -1), 2),
+    ]
+)
+TOTALS_TABLE_STYLE = TableStyle(
+    [
+        ("FONT", (0, 0), (-1, -1), FONT_NAME, FONT_SIZE_NORMAL),
+        ("ALIGN", (0, 0), (-1, -1), "RIGHT"),
+        ("ALIGN", (-1, 0), (-1, -1), "RIGHT"),
+        ("TOPPADDING", (0, 0), (-1, -1), 2),
+        ("BOTTOMPADDING", (0, 0), (-1, -1), 2),
+    ]
+)
+
 # Define namespaces for parsing XML
 NAMESPACES = {
     "rsm": "urn:un:unece:uncefact:data:standard:CrossIndustryInvoice:100",
@@ -59,39 +117,83 @@ NAMESPACES = {
     "udt": "urn:un:unece:uncefact:data:standard:UnqualifiedDataType:100",
 }
 
+# Namespace prefixes in Clark notation, so lookups use qualified tags directly instead of resolving prefixes per call
+RAM = "{" + NAMESPACES["ram"] + "}"
+UDT = "{" + NAMESPACES["udt"] + "}"
+
+# Tags dispatched on while streaming the invoice in parse_zugferd_invoice
+ID_TAG = RAM + "ID"
+ISSUE_DATE_TAG = RAM + "IssueDateTime"
+BUYER_TAG = RAM + "BuyerTradeParty"
+LINE_ITEM_TAG = RAM + "IncludedSupplyChainTradeLineItem"
+TOTALS_TAG = RAM + "SpecifiedTradeSettlementHeaderMonetarySummation"
+TRADE_TAX_TAG = RAM + "ApplicableTradeTax"
+DUE_DATE_TAG = RAM + "DueDateDateTime"
+HEADER_SETTLEMENT_TAG = RAM + "ApplicableHeaderTradeSettlement"
+
+# Paths within the dispatched elements, qualified once at import
+DATE_TIME_STRING = UDT + "DateTimeString"
+NAME = RAM + "Name"
+ANY_NAME = ".//" + RAM + "Name"
+ANY_LINE_ONE = ".//" + RAM + "LineOne"
+ANY_POSTCODE = ".//" + RAM + "PostcodeCode"
+ANY_CITY = ".//" + RAM + "CityName"
+ANY_BILLED_QUANTITY = ".//" + RAM + "BilledQuantity"
+ANY_CHARGE_AMOUNT = ".//" + RAM + "ChargeAmount"
+ANY_LINE_TOTAL = ".//" + RAM + "LineTotalAmount"
+LINE_TOTAL = RAM + "LineTotalAmount"
+TAX_TOTAL = RAM + "TaxTotalAmount"
+GRAND_TOTAL = RAM + "GrandTotalAmount"
+RATE_PERCENT = RAM + "RateApplicablePercent"
+CALCULATED_AMOUNT = RAM + "CalculatedAmount"
+
+
+@lru_cache(maxsize=1)
+def get_icc_profile():
+    """
+    Read the ICC profile once, it is the same for every invoice.
+    """
+    with open(ICCPROFILE_FILE, "rb") as f:
+        return f.read()
+
+
+@lru_cache(maxsize=1)
+def get_xmp_metadata():
+    """
+    Read the XMP metadata once, it is the same for every invoice.
+    """
+    with open(XMP_METADATA_FILE, "rb") as f:
+        return f.read()
+
 
 class MyCanvas(canvas.Canvas):
     """
     Custom canvas class to set PDF/A-3b compliance, load ICC profile, set output intents, and embed XML invoice data.
     """
 
-    def __init__(self, *args, **kwargs):
+    def __init__(self, *args, xml_bytes=None, **kwargs):
         canvas.Canvas.__init__(self, *args, **kwargs)
+        # Content of the XML invoice file to embed, already read for parsing
+        self._xml_bytes = xml_bytes
         # Load ICC profile
-        with open(ICCPROFILE_FILE, "rb") as f:
-            icc_profile = f.read()
+        icc_profile = get_icc_profile()
         # Set output intent
         self.setPageResources(outputProfile=icc_profile)
         self.setOutputIntents(
             pdfa=True, outputConditionIdentifier="Custom", outputCondition="sRGB", destOutputProfile=icc_profile
         )
         # Load XMP metadata
-        with open(XMP_METADATA_FILE, "rb") as f:
-            xmp_metadata = f.read()
-        self.xmpMetadata = xmp_metadata
+        self.xmpMetadata = get_xmp_metadata()
 
     def save(self):
         """
         Override the save method to embed the XML invoice file into the PDF as an attachment with
         AFRelationship 'Alternative'.
         """
-        # Embed the XML invoice file
-        with open(XML_INPUT_FILE, "rb") as f:
-            xml_data = f.read()
         # Embed the XML file with AFRelationship='Alternative'
         self.embedFile(
             filename=XML_INPUT_FILE,
-            data=xml_data,
+            data=self._xml_bytes,
             mimeType="text/xml",
             description="Rechnungsdaten im ZUGFeRD-XML-Format",
             afrelationship="Alternative",
@@ -103,159 +205,305 @@ def parse_zugferd_invoice(xml_file):
     """
     Parse the ZUGFeRD XML invoice file and extract necessary invoice data.
 
+    The document is streamed once, each element of interest is handled when it ends. As with a
+    search of the whole tree, the first occurrence in document order is used for single values.
+
     Args:
-        xml_file (str): Path to the ZUGFeRD XML file.
+        xml_file (str | file): Path to the ZUGFeRD XML file, or a binary file object.
 
     Returns:
         dict: A dictionary containing invoice data including buyer_info, invoice_number, invoice_date,
               articles, totals, vat_percent, and due_date_days.
     """
-    tree = ET.parse(xml_file)
-    root = tree.getroot()
-
-    # Extract invoice number
-    invoice_number = root.find(".//ram:ID", NAMESPACES).text
-
-    # Extract invoice date
-    issue_date_str = root.find(".//ram:IssueDateTime/udt:DateTimeString", NAMESPACES).text
-    issue_date = datetime.datetime.strptime(issue_date_str, "%Y%m%d")
-
-    # Extract buyer information
-    buyer_info = extract_buyer_info(root)
-
-    # Extract articles
-    articles = extract_articles(root)
-
-    # Extract totals
-    total_net, total_tax, total_gross = extract_totals(root)
-
-    # Extract VAT percent
-    vat_percent = extract_vat_percent(root)
-
-    # Extract payment due date and calculate due_date_days
-    due_date_days = calculate_due_date_days(root, issue_date)
-
+    found = {"article_rows": [], "header_tax_amounts": []}
+    context = ET.iterparse(xml_file, events=("end",), tag=list(ELEMENT_HANDLERS))
+    for _, elem in context:
+        ELEMENT_HANDLERS[elem.tag](elem, found)
+        # The values are extracted, free the subtree. No handled element needs an element handled inside it.
+        elem.clear(keep_tail=True)
+    # Free the rest of the document right away instead of keeping it until the parser is collected
+    context.root.clear()
+    del context
+
+    issue_date = parse_yyyymmdd(found["issue_date_str"])
+    # All amounts are converted together
+    total_net, total_tax, total_gross, vat_percent = map(float, (*found["totals"], found["vat_percent"]))
+    articles = articles_to_arrays(found["article_rows"])
+    header_tax_amounts = [float(amount) for amount in found["header_tax_amounts"]]
+    if not validate_totals(articles["amount"], total_net, header_tax_amounts, total_tax, total_gross):
+        warnings.warn(f"Totals of invoice {found['invoice_number']} do not match its articles and taxes")
     return {
-        "buyer_info": buyer_info,
-        "invoice_number": invoice_number,
+        "buyer_info": found["buyer_info"],
+        "invoice_number": found["invoice_number"],
         "invoice_date": issue_date,
         "articles": articles,
         "total_net": total_net,
         "total_tax": total_tax,
         "total_gross": total_gross,
         "vat_percent": vat_percent,
-        "due_date_days": due_date_days,
+        "due_date_days": calculate_due_date_days(found["due_date_str"], issue_date),
     }
 
 
-def extract_buyer_info(root):
+def parse_zugferd_invoice_from_bytes(xml_bytes):
     """
-    Extract buyer information from the XML root element.
+    Parse a ZUGFeRD XML invoice that was already read into memory.
 
     Args:
-        root (xml.etree.ElementTree.Element): Root element of the XML tree.
+        xml_bytes (bytes): Content of the ZUGFeRD XML file.
+
+    Returns:
+        dict: The invoice data, see parse_zugferd_invoice.
+    """
+    return parse_zugferd_invoice(io.BytesIO(xml_bytes))
+
+
+def handle_invoice_number(elem, found):
+    found.setdefault("invoice_number", elem.text)
+
+
+def handle_issue_date(elem, found):
+    if "issue_date_str" not in found:
+        found["issue_date_str"] = elem.findtext(DATE_TIME_STRING)
+
+
+def handle_buyer(elem, found):
+    if "buyer_info" not in found:
+        found["buyer_info"] = extract_buyer_info(elem)
+
+
+def handle_line_item(elem, found):
+    found["article_rows"].append(extract_article(elem))
+    # Earlier line items are already handled, drop them from the tree
+    while elem.getprevious() is not None:
+        del elem.getparent()[0]
+
+
+def handle_totals(elem, found):
+    if "totals" not in found:
+        found["totals"] = extract_totals(elem)
+
+
+def handle_trade_tax(elem, found):
+    if "vat_percent" not in found:
+        found["vat_percent"] = extract_vat_percent(elem)
+    # The header settlement holds one tax per VAT rate, they add up to the tax total
+    if elem.getparent().tag == HEADER_SETTLEMENT_TAG:
+        found["header_tax_amounts"].append(elem.findtext(CALCULATED_AMOUNT, "0"))
+
+
+def handle_due_date(elem, found):
+    if "due_date_str" not in found:
+        found["due_date_str"] = elem.findtext(DATE_TIME_STRING)
+
+
+ELEMENT_HANDLERS = {
+    ID_TAG: handle_invoice_number,
+    ISSUE_DATE_TAG: handle_issue_date,
+    BUYER_TAG: handle_buyer,
+    LINE_ITEM_TAG: handle_line_item,
+    TOTALS_TAG: handle_totals,
+    TRADE_TAX_TAG: handle_trade_tax,
+    DUE_DATE_TAG: handle_due_date,
+}
+
+
+def extract_buyer_info(buyer_element):
+    """
+    Extract buyer information from the BuyerTradeParty element.
+
+    Args:
+        buyer_element (lxml.etree._Element): BuyerTradeParty element.
 
     Returns:
         dict: Dictionary containing buyer information.
     """
-    buyer_element = root.find(".//ram:BuyerTradeParty", NAMESPACES)
     buyer_info = {
-        "name": buyer_element.find("ram:Name", NAMESPACES).text,
-        "street": buyer_element.find(".//ram:LineOne", NAMESPACES).text,
-        "postcode": buyer_element.find(".//ram:PostcodeCode", NAMESPACES).text,
-        "city": buyer_element.find(".//ram:CityName", NAMESPACES).text,
+        "name": buyer_element.findtext(NAME),
+        "street": buyer_element.findtext(ANY_LINE_ONE),
+        "postcode": buyer_element.findtext(ANY_POSTCODE),
+        "city": buyer_element.findtext(ANY_CITY),
         "country": "Deutschland",  # Assuming country name, adjust as necessary
     }
     return buyer_info
 
 
-def extract_articles(root):
+def extract_article(line_item):
     """
-    Extract article line items from the XML root element.
+    Extract an article from a line item element.
 
     Args:
-        root (xml.etree.ElementTree.Element): Root element of the XML tree.
+        line_item (lxml.etree._Element): IncludedSupplyChainTradeLineItem element.
 
     Returns:
-        list: List of dictionaries containing article data.
-    """
-    articles = []
-    for idx, line_item in enumerate(root.findall(".//ram:IncludedSupplyChainTradeLineItem", NAMESPACES), start=1):
-        name = line_item.find(".//ram:Name", NAMESPACES).text
-        quantity = float(line_item.find(".//ram:BilledQuantity", NAMESPACES).text)
-        price = float(line_item.find(".//ram:ChargeAmount", NAMESPACES).text)
-        amount = float(line_item.find(".//ram:LineTotalAmount", NAMESPACES).text)
-        articles.append(
-            {
-                "position": idx,
-                "name": name,
-                "quantity": quantity,
-                "price": price,
-                "amount": amount,
-            }
-        )
-    return articles
+        tuple: Name, quantity, price and amount of the article.
+    """
+    return (
+        line_item.findtext(ANY_NAME),
+        float(line_item.findtext(ANY_BILLED_QUANTITY)),
+        float(line_item.findtext(ANY_CHARGE_AMOUNT)),
+        float(line_item.findtext(ANY_LINE_TOTAL)),
+    )
+
+
+def articles_to_arrays(article_rows):
+    """
+    Convert the extracted article rows into a struct of arrays, one array per field.
+
+    Args:
+        article_rows (list): Tuples of name, quantity, price and amount, in invoice order.
+
+    Returns:
+        dict: Positions and float64 quantities, prices and amounts as NumPy arrays, names as list.
+    """
+    n = len(article_rows)
+    return {
+        "position": np.arange(1, n + 1),
+        "name": [row[0] for row in article_rows],
+        "quantity": np.fromiter((row[1] for row in article_rows), dtype=np.float64, count=n),
+        "price": np.fromiter((row[2] for row in article_rows), dtype=np.float64, count=n),
+        "amount": np.fromiter((row[3] for row in article_rows), dtype=np.float64, count=n),
+    }
+
+
+def extract_totals(totals_element):
+    """
+    Extract total amounts from the SpecifiedTradeSettlementHeaderMonetarySummation element.
+
+    Args:
+        totals_element (lxml.etree._Element): SpecifiedTradeSettlementHeaderMonetarySummation element.
+
+    Returns:
+        tuple: Texts of the total net amount, total tax amount, total gross amount.
+    """
+    return (
+        totals_element.findtext(LINE_TOTAL, ""),
+        totals_element.findtext(TAX_TOTAL, ""),
+        totals_element.findtext(GRAND_TOTAL, ""),
+    )
+
 
+def extract_vat_percent(vat_element):
+    """
+    Extract VAT percentage from the ApplicableTradeTax element.
+
+    Args:
+        vat_element (lxml.etree._Element): ApplicableTradeTax element.
 
-def extract_totals(root):
+    Returns:
+        str: Text of the VAT percentage.
     """
-    Extract total amounts from the XML root element.
+    return vat_element.findtext(RATE_PERCENT, "")
+
+
+def validate_totals(amounts, total_net, header_tax_amounts, total_tax, total_gross):
+    """
+    Check that the invoice totals match the article amounts and taxes, allowing for rounding to cents.
+
+    The tax total is compared with the taxes of the header settlement, one per VAT rate, so invoices with
+    several VAT rates are validated correctly. It is not checked if the invoice has no header taxes.
 
     Args:
-        root (xml.etree.ElementTree.Element): Root element of the XML tree.
+        amounts (np.ndarray): Amounts of the articles.
+        total_net (float): Total net amount.
+        header_tax_amounts (list): Calculated amounts of the header taxes.
+        total_tax (float): Total tax amount.
+        total_gross (float): Total gross amount.
 
     Returns:
-        tuple: Total net amount, total tax amount, total gross amount.
+        bool: True if the sum of the amounts, the tax and the gross amount are consistent.
     """
-    totals_element = root.find(".//ram:SpecifiedTradeSettlementHeaderMonetarySummation", NAMESPACES)
-    total_net = float(totals_element.find("ram:LineTotalAmount", NAMESPACES).text)
-    total_tax = float(totals_element.find("ram:TaxTotalAmount", NAMESPACES).text)
-    total_gross = float(totals_element.find("ram:GrandTotalAmount", NAMESPACES).text)
-    return total_net, total_tax, total_gross
+    net_ok = abs(sum(amounts.tolist()) - total_net) <= TOTALS_TOLERANCE
+    tax_ok = not header_tax_amounts or abs(sum(header_tax_amounts) - total_tax) <= TOTALS_TOLERANCE
+    gross_ok = abs(total_net + total_tax - total_gross) <= TOTALS_TOLERANCE
+    return net_ok and tax_ok and gross_ok
 
 
-def extract_vat_percent(root):
+def parse_yyyymmdd(date_str):
     """
-    Extract VAT percentage from the XML root element.
+    Parse a ZUGFeRD date in the fixed format YYYYMMDD (format 102) by slicing, which is much faster than strptime.
 
     Args:
-        root (xml.etree.ElementTree.Element): Root element of the XML tree.
+        date_str (str): Date in the format YYYYMMDD.
 
     Returns:
-        float: VAT percentage.
+        datetime.date: The parsed date.
     """
-    vat_element = root.find(".//ram:ApplicableTradeTax", NAMESPACES)
-    vat_percent = float(vat_element.find("ram:RateApplicablePercent", NAMESPACES).text)
-    return vat_percent
+    return datetime.date(int(date_str[0:4]), int(date_str[4:6]), int(date_str[6:8]))
 
 
-def calculate_due_date_days(root, issue_date):
+def calculate_due_date_days(due_date_str, issue_date):
     """
     Calculate the number of days until the payment due date.
 
     Args:
-        root (xml.etree.ElementTree.Element): Root element of the XML tree.
-        issue_date (datetime.datetime): Invoice issue date.
+        due_date_str (str): Payment due date in the format YYYYMMDD.
+        issue_date (datetime.date): Invoice issue date.
 
     Returns:
         int: Number of days until payment is due.
     """
-    due_date_str = root.find(".//ram:DueDateDateTime/udt:DateTimeString", NAMESPACES).text
-    due_date = datetime.datetime.strptime(due_date_str, "%Y%m%d")
+    due_date = parse_yyyymmdd(due_date_str)
     due_date_days = (due_date - issue_date).days
     return due_date_days
 
 
-def create_pdf():
+def read_invoice(xml_file):
+    """
+    Read and parse a ZUGFeRD XML file.
+
+    Args:
+        xml_file (str): Path to the ZUGFeRD XML file.
+
+    Returns:
+        tuple: Content of the XML file as bytes and the parsed invoice data.
+    """
+    # Read the ZUGFeRD XML once, it is both parsed and embedded into the PDF
+    with open(xml_file, "rb") as f:
+        xml_bytes = f.read()
+    return xml_bytes, parse_zugferd_invoice_from_bytes(xml_bytes)
+
+
+def create_pdf(xml_file=XML_INPUT_FILE, pdf_file=PDF_OUTPUT_FILE):
     """
     Create the PDF invoice by building the document content and writing to a file.
+
+    Args:
+        xml_file (str): Path to the ZUGFeRD XML file.
+        pdf_file (str): Path of the PDF file to create.
+
+    Returns:
+        bytes: Content of the created PDF file.
     """
     # Parse dynamic data from ZUGFeRD XML
-    invoice_data = parse_zugferd_invoice(XML_INPUT_FILE)
+    xml_bytes, invoice_data = read_invoice(xml_file)
     print(invoice_data)
-    # Create PDF document
+    pdf_bytes = render_pdf(invoice_data, xml_bytes)
+    Path(pdf_file).write_bytes(pdf_bytes)
+    return pdf_bytes
+
+
+def render_pdf(invoice_data, xml_bytes):
+    """
+    Render the PDF invoice from already parsed invoice data.
+
+    The PDF is built in memory, so the file is written in one go instead of many small writes during the build.
+
+    Args:
+        invoice_data (dict): Parsed invoice data, as returned by parse_zugferd_invoice.
+        xml_bytes (bytes): Content of the ZUGFeRD XML file, embedded into the PDF.
+
+    Returns:
+        bytes: Content of the PDF file.
+    """
+    buffer = io.BytesIO()
+    # Create PDF document, the canvas gets the XML content to embed directly
     doc = SimpleDocTemplate(
-        PDF_OUTPUT_FILE, pagesize=A4, canvasmaker=MyCanvas, title="ZUGFeRD Invoice", author=company_info["name"]
+        buffer,
+        pagesize=A4,
+        canvasmaker=partial(MyCanvas, xml_bytes=xml_bytes),
+        title="ZUGFeRD Invoice",
+        author=company_info["name"],
     )
 
     # Set up styles
@@ -271,12 +519,56 @@ def create_pdf():
     add_articles_table(story, invoice_data["articles"], normal_style)
     add_totals_table(story, invoice_data, normal_style)
     add_payment_terms(story, normal_style, invoice_data["due_date_days"])
-    add_company_footer(story, small_style)
 
-    # Build the PDF document
-    doc.build(story)
+    # Build the PDF document, the company footer is drawn on every page below the content frame
+    doc.build(story, onFirstPage=draw_company_footer, onLaterPages=draw_company_footer)
+    return buffer.getvalue()
+
+
+def create_pdfs(xml_files, pdf_dir, workers=None, lookahead=None):
+    """
+    Create the PDF invoices for many ZUGFeRD XML files in parallel.
+
+    The XML files are read and parsed in threads of the main process, while the worker processes render the
+    already parsed invoices in memory and the main process writes the returned PDFs. Each worker process reads
+    the ICC profile and XMP metadata and sets up the styles only once and reuses them for all invoices it renders.
+
+    Args:
+        xml_files (list): Paths to the ZUGFeRD XML files.
+        pdf_dir (str): Directory where the PDF files are created, named like the XML files.
+        workers (int): Number of worker processes, defaults to the number of CPUs.
+        lookahead (int): Maximum number of invoices being parsed or rendered at the same time,
+            defaults to twice the number of workers.
+    """
+    os.makedirs(pdf_dir, exist_ok=True)
+    pdf_files = [
+        os.path.join(pdf_dir, f"{os.path.splitext(os.path.basename(xml_file))[0]}.pdf") for xml_file in xml_files
+    ]
+    workers = workers or os.cpu_count() or 1
+    asyncio.run(_create_pdfs_pipeline(xml_files, pdf_files, workers, lookahead or 2 * workers))
+
+
+async def _create_pdfs_pipeline(xml_files, pdf_files, workers, lookahead):
+    """
+    Parse the invoices in threads, hand them over to a process pool for rendering and write the PDFs in threads.
+
+    The semaphore bounds the invoices in flight, so at most lookahead parsed invoices are held in memory.
+    """
+    loop = asyncio.get_running_loop()
+    window = asyncio.Semaphore(lookahead)
 
+    with ProcessPoolExecutor(max_workers=workers) as executor:
 
+        async def convert(xml_file, pdf_file):
+            async with window:
+                xml_bytes, invoice_data = await asyncio.to_thread(read_invoice, xml_file)
+                pdf_bytes = await loop.run_in_executor(executor, render_pdf, invoice_data, xml_bytes)
+                await asyncio.to_thread(Path(pdf_file).write_bytes, pdf_bytes)
+
+        await asyncio.gather(*(convert(xml_file, pdf_file) for xml_file, pdf_file in zip(xml_files, pdf_files)))
+
+
+@lru_cache(maxsize=1)
 def get_styles():
     """
     Set up the paragraph styles used in the document.
@@ -290,10 +582,8 @@ def get_styles():
     normal_style.fontSize = FONT_SIZE_NORMAL
     normal_style.leading = 14
 
-    small_style = stylesheet["Normal"]
-    small_style.fontName = FONT_NAME
-    small_style.fontSize = FONT_SIZE_SMALL
-    small_style.leading = 12
+    # Derived style, taking stylesheet["Normal"] again would return and overwrite the same object
+    small_style = ParagraphStyle("Small", parent=normal_style, fontSize=FONT_SIZE_SMALL, leading=12)
 
     return normal_style, small_style
 
@@ -306,19 +596,27 @@ def add_seller_address(story, style):
         story (list): The story list to which the content is added.
         style (ParagraphStyle): The paragraph style to be used.
     """
-    seller_address = f"""{company_info['name']}<br/>
-    {company_info['street']}<br/>
-    {company_info['postcode']} {company_info['city']}<br/>
-    {company_info['country']}<br/>
-    Tel. {company_info['phone']}<br/>
-    Fax {company_info['fax']}<br/>
-    {company_info['email']}<br/>
-    {company_info['url']}"""
-    p_seller_address = Paragraph(seller_address, style)
-    story.append(p_seller_address)
+    story.append(get_seller_address_paragraph(style))
     story.append(Spacer(1, 20))
 
 
+@lru_cache(maxsize=None)
+def get_seller_address_paragraph(style):
+    """
+    Get the paragraph of the seller's address, which is the same for every invoice.
+
+    The paragraph is built once per style and shared between documents. It is reused safely because it
+    is the first flowable on the page and is never split.
+
+    Args:
+        style (ParagraphStyle): The paragraph style to be used.
+
+    Returns:
+        Paragraph: The seller's address.
+    """
+    return Paragraph(SELLER_ADDRESS_TEXT, style)
+
+
 def add_buyer_address(story, style, buyer_info):
     """
     Add the buyer's address to the story.
@@ -357,17 +655,7 @@ def add_invoice_details(story, style, invoice_data):
 
     t_invoice_details = Table(invoice_details, colWidths=[150, 200])
 
-    t_invoice_details.setStyle(
-        TableStyle(
-            [
-                ("ALIGN", (0, 0), (-1, -1), "LEFT"),
-                ("FONT", (0, 0), (-1, -1), FONT_NAME, FONT_SIZE_NORMAL),
-                ("VALIGN", (0, 0), (-1, -1), "MIDDLE"),
-                ("TOPPADDING", (0, 0), (-1, -1), 2),
-                ("BOTTOMPADDING", (0, 0), (-1, -1), 2),
-            ]
-        )
-    )
+    t_invoice_details.setStyle(INVOICE_DETAILS_TABLE_STYLE)
 
     story.append(t_invoice_details)
     story.append(Spacer(1, 20))
@@ -379,42 +667,48 @@ def add_articles_table(story, articles, style):
 
     Args:
         story (list): The story list to which the content is added.
-        articles (list): List of articles to be included in the table.
+        articles (dict): Struct of arrays of the articles to be included in the table.
         style (ParagraphStyle): The paragraph style to be used.
     """
     headers = ["Pos.", "Artikelbeschreibung", "Menge", "Preis", "Betrag"]
     table_data = [headers]
 
-    for article in articles:
-        position = article["position"]
-        name = article["name"]
-        quantity = article["quantity"]
-        price = article["price"]
-        amount = article["amount"]
-        row = [str(position), name, f"{quantity:.2f}", f"{price:.2f}", f"{amount:.2f}"]
-        table_data.append(row)
+    # Each column is formatted with the bound format method over plain floats, then the columns are zipped into rows
+    table_data.extend(
+        map(
+            list,
+            zip(
+                get_position_labels(len(articles["position"])),
+                articles["name"],
+                map(_fmt2, articles["quantity"].tolist()),
+                map(_fmt2, articles["price"].tolist()),
+                map(_fmt2, articles["amount"].tolist()),
+            ),
+        )
+    )
 
     t_items = Table(table_data, colWidths=[40, 200, 60, 60, 60])
 
-    t_items.setStyle(
-        TableStyle(
-            [
-                ("GRID", (0, 0), (-1, -1), 0.5, colors.black),
-                ("FONT", (0, 0), (-1, -1), FONT_NAME, FONT_SIZE_NORMAL),
-                ("ALIGN", (0, 0), (-1, 0), "CENTER"),
-                ("BACKGROUND", (0, 0), (-1, 0), colors.lightgrey),
-                ("ALIGN", (0, 1), (0, -1), "RIGHT"),
-                ("ALIGN", (2, 1), (-1, -1), "RIGHT"),
-                ("TOPPADDING", (0, 0), (-1, -1), 2),
-                ("BOTTOMPADDING", (0, 0), (-1, -1), 2),
-            ]
-        )
-    )
+    t_items.setStyle(ARTICLES_TABLE_STYLE)
 
     story.append(t_items)
     story.append(Spacer(1, 20))
 
 
+@lru_cache(maxsize=None)
+def get_position_labels(count):
+    """
+    Get the position column of an articles table, which only depends on the number of articles.
+
+    Args:
+        count (int): Number of articles.
+
+    Returns:
+        tuple: Position numbers 1 to count as strings.
+    """
+    return tuple(map(str, range(1, count + 1)))
+
+
 def add_totals_table(story, invoice_data, style):
     """
     Add the totals table to the story.
@@ -424,30 +718,26 @@ def add_totals_table(story, invoice_data, style):
         invoice_data (dict): Dictionary containing invoice totals and VAT percent.
         style (ParagraphStyle): The paragraph style to be used.
     """
-    total_net = invoice_data["total_net"]
-    total_tax = invoice_data["total_tax"]
-    total_gross = invoice_data["total_gross"]
-    vat_percent = invoice_data["vat_percent"]
+    # All amounts are formatted in one call
+    total_net, total_tax, total_gross, vat_percent = map(
+        _fmt2,
+        (
+            invoice_data["total_net"],
+            invoice_data["total_tax"],
+            invoice_data["total_gross"],
+            invoice_data["vat_percent"],
+        ),
+    )
 
     total_data = [
-        ["Rechnungssumme netto", "", "", "", f"{total_net:.2f}"],
-        [f"zuzüglich {vat_percent:.2f}% MwSt.", "", "", "", f"{total_tax:.2f}"],
-        ["Rechnungssumme brutto", "", "", "", f"{total_gross:.2f}"],
+        ["Rechnungssumme netto", "", "", "", total_net],
+        [f"zuzüglich {vat_percent}% MwSt.", "", "", "", total_tax],
+        ["Rechnungssumme brutto", "", "", "", total_gross],
     ]
 
     t_totals = Table(total_data, colWidths=[360, 60])
 
-    t_totals.setStyle(
-        TableStyle(
-            [
-                ("FONT", (0, 0), (-1, -1), FONT_NAME, FONT_SIZE_NORMAL),
-                ("ALIGN", (0, 0), (-1, -1), "RIGHT"),
-                ("ALIGN", (-1, 0), (-1, -1), "RIGHT"),
-                ("TOPPADDING", (0, 0), (-1, -1), 2),
-                ("BOTTOMPADDING", (0, 0), (-1, -1), 2),
-            ]
-        )
-    )
+    t_totals.setStyle(TOTALS_TABLE_STYLE)
 
     story.append(t_totals)
     story.append(Spacer(1, 20))
@@ -472,21 +762,23 @@ def add_payment_terms(story, style, due_date_days):
     story.append(Spacer(1, 20))
 
 
-def add_company_footer(story, style):
+def draw_company_footer(canv, doc):
     """
-    Add the company footer to the story.
+    Draw the company footer at the bottom of the page directly on the canvas, used as page callback of doc.build.
+
+    The footer is fixed text at a fixed position, so it does not need to go through the flowable layout.
 
     Args:
-        story (list): The story list to which the content is added.
-        style (ParagraphStyle): The paragraph style to be used.
-    """
-    footer_text = (
-        f"{company_info['name']} • Sitz der Gesellschaft • USt-IdNr • {company_info['bank_name']}<br/>"
-        f"{company_info['director']} • {company_info['company_registration']} • "
-        f"{company_info['vat_id']} • {company_info['iban']}"
-    )
-    p_footer = Paragraph(footer_text, style)
-    story.append(p_footer)
+        canv (Canvas): The canvas of the page being drawn.
+        doc (SimpleDocTemplate): The document being built, provides the page margins.
+    """
+    canv.saveState()
+    canv.setFont(FONT_NAME, FONT_SIZE_SMALL)
+    y = doc.bottomMargin - FOOTER_LEADING
+    for line in COMPANY_FOOTER_LINES:
+        canv.drawString(doc.leftMargin, y, line)
+        y -= FOOTER_LEADING
+    canv.restoreState()
 
 
 if __name__ == "__main__":